@@ -224,6 +224,28 @@ class Circuit:
         
         return (first_gate_time, last_gate_time)
     
+    def get_qubit_lifetimes(self, qubits=None):
+        
+        # Lifetimes of many qubits in a single pass over the gates
+        if qubits is None:
+            qubits = self.qubits
+        
+        spans = {}
+        for gate in self.gates:
+            start_time = gate.time
+            end_time = gate.end_time
+            for qubit in gate.qubits:
+                span = spans.get(qubit)
+                if span is None:
+                    spans[qubit] = [start_time, end_time]
+                else:
+                    if start_time < span[0]:
+                        span[0] = start_time
+                    if end_time > span[1]:
+                        span[1] = end_time
+        
+        return [tuple(spans[qubit]) if qubit in spans else (0, 0) for qubit in qubits]
+    
     def calculate_depth(self):
         
         if not self.gates:
@@ -240,8 +262,7 @@ class Circuit:
         if total_depth == 0:
             return {qubit.id: (0, 0, 0.0) for qubit in self.qubits}
         
-        for qubit in self.qubits:
-            first_time, last_time = self.get_qubit_lifetime(qubit)
+        for qubit, (first_time, last_time) in zip(self.qubits, self.get_qubit_lifetimes()):
             lifetime = last_time - first_time
             usage_ratio = lifetime / total_depth if total_depth > 0 else 0.0
             usage[qubit.id] = (first_time, last_time, usage_ratio)
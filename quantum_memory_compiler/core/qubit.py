@@ -324,7 +324,6 @@ class Qubit:
         """Qubit'in son kullanım zamanını günceller"""
         # Only record if time has advanced
         if time > self.last_usage_time and self.is_active:
-            time_diff = time - self.last_usage_time
             self.last_usage_time = time
     
     def _record_operation(self, operation_name, start_time=None, end_time=None):
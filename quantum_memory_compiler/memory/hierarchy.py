@@ -26,9 +26,104 @@ Bellek Hiyerarşisi modülü
 Kuantum bellek hiyerarşisini ve farklı bellek seviyelerini temsil eden sınıf.
 """
 
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 from ..core.qubit import MemoryLevel, QubitType
 
 
+# Konfigürasyonda standart seviyeleri belirten isimler
+_STANDARD_LEVEL_ALIASES = {
+    'L1': 'L1', 'FAST_MEMORY': 'L1',
+    'L2': 'L2', 'BUFFER_MEMORY': 'L2',
+    'L3': 'L3', 'SLOW_MEMORY': 'L3',
+}
+
+_STANDARD_LEVELS = ("L1", "L2", "L3")
+
+# Standart seviye adından qubit MemoryLevel değerine eşleştirme
+_MEMORY_LEVELS = {"L1": MemoryLevel.L1, "L2": MemoryLevel.L2, "L3": MemoryLevel.L3}
+
+
+def _transfer_cost_core(static_cost, target_coherence, target_utilization, target_is_l1,
+                        has_qubit, qubit_coherence, gate_count):
+    """
+    Transfer cost formula shared by get_transfer_cost and the batched kernel
+    
+    Args:
+        static_cost: Transfer time plus scaled transfer error rate
+        target_coherence: Coherence time of the target level
+        target_utilization: Utilization of the target level
+        target_is_l1: Whether the target level is L1
+        has_qubit: Whether a qubit is given
+        qubit_coherence: Coherence time of the qubit (0 if unknown)
+        gate_count: Gate count of the qubit
+        
+    Returns:
+        float: Non-negative transfer cost
+    """
+    qubit_specific_cost = 0.0
+    if has_qubit:
+        # If the target coherence is much higher than needed (more than 5x),
+        # it's wasteful (higher cost); the division only runs in that case
+        if qubit_coherence != 0 and target_coherence > 5 * qubit_coherence:
+            qubit_specific_cost += (target_coherence - 5 * qubit_coherence) * 0.5 / qubit_coherence
+        
+        # If the qubit has high activity, L1 is preferred (lower cost)
+        if target_is_l1 and gate_count > 10:
+            qubit_specific_cost -= 2
+    
+    total_cost = static_cost + target_utilization * 5 + qubit_specific_cost
+    return total_cost if total_cost > 0 else 0.0
+
+
+if HAS_NUMBA:
+    _transfer_cost_core_compiled = njit(cache=True)(_transfer_cost_core)
+else:
+    _transfer_cost_core_compiled = _transfer_cost_core
+
+
+def _transfer_cost_rows(source_index, target_index, has_qubit, qubit_coherence, gate_count,
+                        static_costs, coherence_times, utilizations, l1_index):
+    """
+    Computes get_transfer_cost for many (source, target, qubit) rows at once
+    
+    Compiled with Numba when available; otherwise it runs as a plain loop
+    over _transfer_cost_core.
+    
+    Args:
+        source_index: Source level index per row
+        target_index: Target level index per row
+        has_qubit: Whether a qubit is given for the row
+        qubit_coherence: Coherence time of the row's qubit (0 if unknown)
+        gate_count: Gate count of the row's qubit
+        static_costs: Static (time + scaled error) cost matrix
+        coherence_times: Coherence time per level
+        utilizations: Utilization per level
+        l1_index: Index of the L1 level
+        
+    Returns:
+        np.ndarray: Cost per row
+    """
+    n = source_index.shape[0]
+    costs = np.empty(n)
+    for i in range(n):
+        target = target_index[i]
+        costs[i] = _transfer_cost_core_compiled(static_costs[source_index[i], target], coherence_times[target],
+                                                utilizations[target], target == l1_index, has_qubit[i],
+                                                qubit_coherence[i], gate_count[i])
+    return costs
+
+
+if HAS_NUMBA:
+    _transfer_cost_rows = njit(cache=True)(_transfer_cost_rows)
+
+
 class MemoryLevelManager:
     """Bellek hiyerarşisindeki bir seviyeyi temsil eden sınıf"""
     
@@ -51,7 +146,15 @@ class MemoryLevelManager:
         
         # İzleme değişkenleri
         self.used_qubits = 0
-        self.active_qubits = []
+        
+        # Slab tahsisi: kapasite kadar önceden ayrılmış yuva dizisi ve boş yuva listesi
+        self._slots = np.empty(capacity, dtype=object)
+        self._free = list(range(capacity - 1, -1, -1))
+    
+    @property
+    def active_qubits(self):
+        """Bu seviyede tahsis edilmiş qubit'lerin listesini döndürür"""
+        return [qubit for qubit in self._slots if qubit is not None]
     
     @property
     def available_capacity(self):
@@ -73,11 +176,13 @@ class MemoryLevelManager:
         Returns:
             bool: Tahsis başarılı oldu mu?
         """
-        if self.available_capacity <= 0:
+        if self.available_capacity <= 0 or not self._free:
             return False
         
+        slot = self._free.pop()
+        self._slots[slot] = qubit
+        qubit._slot_idx = slot
         self.used_qubits += 1
-        self.active_qubits.append(qubit)
         
         # Qubit'in fiziksel özelliklerini bu seviyeye göre ayarla
         qubit.coherence_time = self.coherence_time
@@ -85,6 +190,34 @@ class MemoryLevelManager:
         
         return True
     
+    def allocate_qubits(self, qubits):
+        """
+        Birden çok qubit'i bu seviyede tahsis eder
+        
+        Args:
+            qubits: Tahsis edilecek qubit'ler (sıralı)
+            
+        Returns:
+            int: Kapasiteye sığan ve tahsis edilen qubit sayısı
+        """
+        count = min(len(qubits), self.available_capacity, len(self._free))
+        if count <= 0:
+            return 0
+        
+        free = self._free
+        slots = self._slots
+        coherence_time = self.coherence_time
+        error_rate = self.error_rate
+        for qubit in qubits[:count]:
+            slot = free.pop()
+            slots[slot] = qubit
+            qubit._slot_idx = slot
+            qubit.coherence_time = coherence_time
+            qubit.error_rate = error_rate
+        
+        self.used_qubits += count
+        return count
+    
     def deallocate_qubit(self, qubit):
         """
         Qubit'i serbest bırakır
@@ -95,11 +228,32 @@ class MemoryLevelManager:
         Returns:
             bool: İşlem başarılı oldu mu?
         """
-        if qubit in self.active_qubits:
-            self.active_qubits.remove(qubit)
-            self.used_qubits -= 1
-            return True
-        return False
+        slot = self._find_slot(qubit)
+        if slot is None:
+            return False
+        
+        self._slots[slot] = None
+        self._free.append(slot)
+        self.used_qubits -= 1
+        return True
+    
+    def _find_slot(self, qubit):
+        """Qubit'in bu seviyedeki yuva indeksini döndürür (yoksa None)"""
+        slot = getattr(qubit, "_slot_idx", None)
+        if slot is not None and slot < len(self._slots) and self._slots[slot] is qubit:
+            return slot
+        
+        # Qubit başka bir hiyerarşide de tahsis edildiyse indeks güncel olmayabilir
+        for index, occupant in enumerate(self._slots):
+            if occupant is qubit:
+                return index
+        return None
+    
+    def reset(self):
+        """Seviyedeki tüm tahsisleri tek seferde serbest bırakır"""
+        self._slots.fill(None)
+        self._free = list(range(self.capacity - 1, -1, -1))
+        self.used_qubits = 0
     
     def __str__(self):
         return (f"MemoryLevelManager({self.name}, cap={self.capacity}, "
@@ -107,7 +261,14 @@ class MemoryLevelManager:
 
 
 class MemoryHierarchy:
-    """Kuantum bellek hiyerarşisi sınıfı"""
+    """
+    Kuantum bellek hiyerarşisi sınıfı
+    
+    Transfer maliyet modelinden (levels, transfer_times, transfer_error_rates)
+    türetilen tablolar önbelleğe alınır. add_level bunları kendisi geçersiz
+    kılar; bu sözlükler doğrudan değiştirildiğinde invalidate_cost_tables()
+    çağrılmalıdır.
+    """
     
     def __init__(self, l1_capacity=50, l2_capacity=100, l3_capacity=200):
         """
@@ -148,6 +309,9 @@ class MemoryHierarchy:
         # İzleme değişkenleri
         self.total_transfers = 0
         self.transfer_stats = {key: 0 for key in self.transfer_times.keys()}
+        
+        # Transfer maliyet modelinden türetilen ön hesaplamalar
+        self._refresh_cost_tables()
     
     @classmethod
     def from_config(cls, config_data):
@@ -160,49 +324,41 @@ class MemoryHierarchy:
         Returns:
             MemoryHierarchy: Oluşturulan bellek hiyerarşisi
         """
-        # Varsayılan kapasiteler
-        l1_capacity = 50
-        l2_capacity = 100
-        l3_capacity = 200
+        # Varsayılan kapasiteler ve özel seviyeler
+        capacities = {'L1': 50, 'L2': 100, 'L3': 200}
+        custom_levels = []
         
-        # Konfigürasyondan kapasiteleri güncelle
-        if isinstance(config_data, dict) and 'hierarchy' in config_data:
-            hierarchy_data = config_data['hierarchy']
-            
-            # Eğer levels tanımlanmışsa, özel kapasiteleri kullan
-            if 'levels' in hierarchy_data and isinstance(hierarchy_data['levels'], list):
-                for level in hierarchy_data['levels']:
-                    if isinstance(level, dict) and 'name' in level and 'capacity' in level:
-                        name = level['name'].upper()
-                        capacity = level['capacity']
-                        
-                        if name == 'L1' or name == 'FAST_MEMORY':
-                            l1_capacity = capacity
-                        elif name == 'L2' or name == 'BUFFER_MEMORY':
-                            l2_capacity = capacity
-                        elif name == 'L3' or name == 'SLOW_MEMORY':
-                            l3_capacity = capacity
+        hierarchy_data = config_data.get('hierarchy') if isinstance(config_data, dict) else None
+        levels = hierarchy_data.get('levels') if isinstance(hierarchy_data, dict) else None
+        
+        # Seviyeleri tek geçişte standart kapasiteler ve özel seviyeler olarak ayır
+        if isinstance(levels, list):
+            for level in levels:
+                if not isinstance(level, dict) or 'name' not in level:
+                    continue
+                
+                upper_name = level['name'].upper()
+                
+                if 'capacity' in level:
+                    standard_name = _STANDARD_LEVEL_ALIASES.get(upper_name)
+                    if standard_name:
+                        capacities[standard_name] = level['capacity']
+                
+                # Eğer standart L1, L2, L3 değilse, özel seviye olarak ekle
+                if upper_name not in capacities:
+                    custom_levels.append(level)
         
         # Yeni hiyerarşi oluştur
-        hierarchy = cls(l1_capacity, l2_capacity, l3_capacity)
+        hierarchy = cls(capacities['L1'], capacities['L2'], capacities['L3'])
         
-        # Eğer özel seviyeler tanımlanmışsa, bunları ekle
-        if isinstance(config_data, dict) and 'hierarchy' in config_data:
-            hierarchy_data = config_data['hierarchy']
-            
-            if 'levels' in hierarchy_data and isinstance(hierarchy_data['levels'], list):
-                for level in hierarchy_data['levels']:
-                    if isinstance(level, dict) and 'name' in level:
-                        # Eğer standart L1, L2, L3 değilse, özel seviye olarak ekle
-                        name = level['name']
-                        if name.upper() not in ('L1', 'L2', 'L3'):
-                            hierarchy.add_level(
-                                name=name,
-                                capacity=level.get('capacity', 50),
-                                access_time=level.get('access_time', 5),
-                                error_rate=level.get('error_rate', 0.001),
-                                coherence_time=level.get('coherence_time', 100)
-                            )
+        for level in custom_levels:
+            hierarchy.add_level(
+                name=level['name'],
+                capacity=level.get('capacity', 50),
+                access_time=level.get('access_time', 5),
+                error_rate=level.get('error_rate', 0.001),
+                coherence_time=level.get('coherence_time', 100)
+            )
         
         return hierarchy
     
@@ -239,9 +395,66 @@ class MemoryHierarchy:
             # Transfer istatistiklerini güncelle
             self.transfer_stats[(name, existing_level)] = 0
             self.transfer_stats[(existing_level, name)] = 0
-            
+        
+        self.invalidate_cost_tables()
+        
         return True
     
+    def _static_transfer_cost(self, source_name, target_name):
+        """Qubit and utilization independent part of get_transfer_cost"""
+        transfer_key = (source_name, target_name)
+        return (self.transfer_times.get(transfer_key, 10) +
+                self.transfer_error_rates.get(transfer_key, 0.01) * 100)
+    
+    def invalidate_cost_tables(self):
+        """
+        Transfer maliyet modelinden türetilen tabloları geçersiz kılar
+        
+        levels, transfer_times veya transfer_error_rates doğrudan
+        değiştirildikten sonra çağrılmalıdır; tablolar bir sonraki
+        kullanımda yeniden oluşturulur.
+        """
+        self._cost_tables_dirty = True
+    
+    def _refresh_cost_tables(self):
+        """
+        Rebuilds the tables derived from the transfer cost model
+        
+        Called lazily by their readers after invalidate_cost_tables.
+        """
+        # An indirect path can only beat the direct one if its static cost is
+        # low enough. The last leg shares the target's utilization and
+        # coherence terms with the direct path, so after scaling by 0.8 those
+        # terms, like the intermediate level's utilization and coherence
+        # penalty, can only add to the indirect side. Only the L1 activity
+        # bonus favours it: by at most 2 on the intermediate leg and 0.2 * 2
+        # on the shared target term. The margin of 4 covers both, so pairs
+        # outside this set never take the indirect branch in smart_transfer.
+        intermediates = ("L1", "L2", "L3")
+        self._indirect_useful = set()
+        for source in self.levels:
+            for target in self.levels:
+                if source == target:
+                    continue
+                direct = self._static_transfer_cost(source, target)
+                best_indirect = min(
+                    (self._static_transfer_cost(source, mid) + self._static_transfer_cost(mid, target)
+                     for mid in intermediates if mid != source and mid != target),
+                    default=float('inf')
+                )
+                if best_indirect - 4 < direct * 0.8:
+                    self._indirect_useful.add((source, target))
+        
+        # Static cost per level pair, as a dict for get_transfer_cost and as a
+        # matrix for the batched cost kernel
+        self._level_index = {name: index for index, name in enumerate(self.levels)}
+        self._static_costs = {(source, target): self._static_transfer_cost(source, target)
+                              for source in self.levels for target in self.levels}
+        self._static_cost_matrix = np.array([[self._static_costs[source, target] for target in self.levels]
+                                             for source in self.levels], dtype=float)
+        
+        self._cost_tables_dirty = False
+    
     def get_level(self, level_name):
         """
         Bellek seviyesini ismine göre döndürür
@@ -279,15 +492,37 @@ class MemoryHierarchy:
         result = level.allocate_qubit(qubit)
         if result:
             # Qubit'in memory_level'ini uygun bellek seviyesine ayarla
-            if level_name == "L1":
-                qubit.set_memory_level(MemoryLevel.L1)
-            elif level_name == "L2":
-                qubit.set_memory_level(MemoryLevel.L2)
-            elif level_name == "L3":
-                qubit.set_memory_level(MemoryLevel.L3)
+            memory_level = _MEMORY_LEVELS.get(level_name)
+            if memory_level is not None:
+                qubit.set_memory_level(memory_level)
         
         return result
     
+    def allocate_qubits_bulk(self, qubits, level_name):
+        """
+        Birden çok qubit'i tek çağrıda aynı seviyede tahsis eder
+        
+        Args:
+            qubits: Tahsis edilecek qubit'ler (sıralı)
+            level_name: Bellek seviyesi adı
+            
+        Returns:
+            int: Başarıyla tahsis edilen qubit sayısı (listenin başından itibaren)
+        """
+        level = self.get_level(level_name)
+        if not level:
+            return 0
+        
+        count = level.allocate_qubits(qubits)
+        if count:
+            # Qubit'lerin memory_level'ini uygun bellek seviyesine ayarla
+            memory_level = _MEMORY_LEVELS.get(level_name)
+            if memory_level is not None:
+                for qubit in qubits[:count]:
+                    qubit.set_memory_level(memory_level)
+        
+        return count
+    
     def deallocate_qubit(self, qubit):
         """
         Qubit'i serbest bırakır
@@ -298,7 +533,7 @@ class MemoryHierarchy:
         Returns:
             bool: İşlem başarılı oldu mu?
         """
-        level_name = qubit.memory_level.name if hasattr(qubit.memory_level, "name") else qubit.memory_level
+        level_name = getattr(qubit.memory_level, "name", qubit.memory_level)
         level = self.get_level(level_name)
         if not level:
             return False
@@ -317,7 +552,7 @@ class MemoryHierarchy:
             tuple: (başarı durumu, transfer süresi)
         """
         # Qubit'in şu anki bellek seviyesini belirle
-        current_level_name = qubit.memory_level.name if hasattr(qubit.memory_level, "name") else qubit.memory_level
+        current_level_name = getattr(qubit.memory_level, "name", qubit.memory_level)
         
         # Hedef seviye ile aynıysa, transfer gerekmez
         if current_level_name == target_level_name:
@@ -330,37 +565,93 @@ class MemoryHierarchy:
         if not current_level or not target_level:
             return False, 0
         
-        # Hedef seviyede yer var mı?
-        if target_level.available_capacity <= 0:
+        # Hedef seviyede yer var mı? (tek iş parçacıklı modelde bu kontrol
+        # sonrasında hedefe yerleştirme başarısız olamaz, geri alma gerekmez)
+        if target_level.available_capacity <= 0 or not target_level._free:
             return False, 0
         
         # Transfer süresini belirle
         transfer_key = (current_level_name, target_level_name)
         transfer_time = self.transfer_times.get(transfer_key, 10)  # Varsayılan 10 birim
         
-        # Qubit'i şu anki seviyeden çıkar
-        current_level.deallocate_qubit(qubit)
+        # Qubit'i şu anki seviyedeki yuvasından çıkar
+        slot = current_level._find_slot(qubit)
+        if slot is not None:
+            current_level._slots[slot] = None
+            current_level._free.append(slot)
+            current_level.used_qubits -= 1
         
-        # Qubit'i hedef seviyeye ekle
-        success = target_level.allocate_qubit(qubit)
+        # Qubit'i hedef seviyedeki boş bir yuvaya yerleştir
+        slot = target_level._free.pop()
+        target_level._slots[slot] = qubit
+        target_level.used_qubits += 1
+        qubit._slot_idx = slot
+        qubit.coherence_time = target_level.coherence_time
+        qubit.error_rate = target_level.error_rate
         
-        if success:
-            # Qubit'in bellek seviyesini güncelle
-            if target_level_name == "L1":
-                qubit.set_memory_level(MemoryLevel.L1)
-            elif target_level_name == "L2":
-                qubit.set_memory_level(MemoryLevel.L2)
-            elif target_level_name == "L3":
-                qubit.set_memory_level(MemoryLevel.L3)
+        # Qubit'in bellek seviyesini güncelle
+        memory_level = _MEMORY_LEVELS.get(target_level_name)
+        if memory_level is not None:
+            qubit.set_memory_level(memory_level)
+        
+        # Transfer istatistiklerini güncelle
+        self.total_transfers += 1
+        self.transfer_stats[transfer_key] = self.transfer_stats.get(transfer_key, 0) + 1
+        
+        return True, transfer_time
+    
+    def transfer_qubits_bulk(self, qubits, source_level_name, target_level_name):
+        """
+        Aynı kaynak seviyeden aynı hedef seviyeye giden qubit'leri tek çağrıda taşır
+        
+        Args:
+            qubits: Taşınacak qubit'ler (sıralı)
+            source_level_name: Qubit'lerin şu anki bellek seviyesi adı
+            target_level_name: Hedef bellek seviyesi adı
             
-            # Transfer istatistiklerini güncelle
-            self.total_transfers += 1
-            self.transfer_stats[transfer_key] = self.transfer_stats.get(transfer_key, 0) + 1
-        else:
-            # Transfer başarısız olduysa, qubit'i orijinal seviyeye geri koy
-            current_level.allocate_qubit(qubit)
+        Returns:
+            tuple: (taşınan qubit sayısı, qubit başına transfer süresi) - hedefe sığan
+                önek (listenin başından itibaren) taşınır
+        """
+        if source_level_name == target_level_name:
+            return len(qubits), 0
+        
+        current_level = self.get_level(source_level_name)
+        target_level = self.get_level(target_level_name)
+        if not current_level or not target_level:
+            return 0, 0
+        
+        count = min(len(qubits), target_level.available_capacity, len(target_level._free))
+        if count <= 0:
+            return 0, 0
+        
+        transfer_key = (source_level_name, target_level_name)
+        transfer_time = self.transfer_times.get(transfer_key, 10)  # Varsayılan 10 birim
+        memory_level = _MEMORY_LEVELS.get(target_level_name)
+        coherence_time = target_level.coherence_time
+        error_rate = target_level.error_rate
+        
+        for qubit in qubits[:count]:
+            slot = current_level._find_slot(qubit)
+            if slot is not None:
+                current_level._slots[slot] = None
+                current_level._free.append(slot)
+                current_level.used_qubits -= 1
+            
+            slot = target_level._free.pop()
+            target_level._slots[slot] = qubit
+            qubit._slot_idx = slot
+            qubit.coherence_time = coherence_time
+            qubit.error_rate = error_rate
+            if memory_level is not None:
+                qubit.set_memory_level(memory_level)
+        target_level.used_qubits += count
+        
+        # Transfer istatistiklerini tek seferde güncelle
+        self.total_transfers += count
+        self.transfer_stats[transfer_key] = self.transfer_stats.get(transfer_key, 0) + count
         
-        return success, transfer_time
+        return count, transfer_time
     
     def get_best_level_for_qubit(self, qubit, lifetime):
         """
@@ -380,6 +671,23 @@ class MemoryHierarchy:
         else:
             return "L3"
     
+    def get_lifetime_thresholds(self):
+        """
+        get_best_level_for_qubit kararının eşiklerini döndürür
+        
+        Yaşam süresi thresholds[i] değerinden küçük veya eşit olan ilk i için
+        level_names[i], hiçbiri sağlanmazsa son seviye seçilir. Eşikler
+        seviyelerin güncel koherans sürelerinden hesaplanır.
+        
+        Returns:
+            tuple: (thresholds, level_names)
+        """
+        l1_threshold = self.levels["L1"].coherence_time * 0.7
+        l2_threshold = self.levels["L2"].coherence_time * 0.7
+        
+        # L1 önce kontrol edildiğinden L2 eşiği L1 eşiğinden küçük olamaz
+        return (l1_threshold, max(l1_threshold, l2_threshold)), _STANDARD_LEVELS
+    
     def get_total_capacity(self):
         """Tüm bellek hiyerarşisinin toplam kapasitesini döndürür"""
         return sum(level.capacity for level in self.levels.values())
@@ -401,11 +709,14 @@ class MemoryHierarchy:
                               for key, count in self.transfer_stats.items()}
         }
     
+    def deallocate_all(self):
+        """Tüm seviyelerdeki qubit tahsislerini tek seferde serbest bırakır (istatistikler korunur)"""
+        for level in self.levels.values():
+            level.reset()
+    
     def reset(self):
         """Bellek hiyerarşisini sıfırlar"""
-        for level in self.levels.values():
-            level.used_qubits = 0
-            level.active_qubits = []
+        self.deallocate_all()
         
         self.total_transfers = 0
         self.transfer_stats = {key: 0 for key in self.transfer_times.keys()}
@@ -431,36 +742,62 @@ class MemoryHierarchy:
         source_name = source_level.name if hasattr(source_level, "name") else source_level
         target_name = target_level.name if hasattr(target_level, "name") else target_level
         
-        # Get basic transfer time
-        transfer_key = (source_name, target_name)
-        base_time_cost = self.transfer_times.get(transfer_key, 10)
+        if self._cost_tables_dirty:
+            self._refresh_cost_tables()
         
-        # Get error rate for this transfer
-        error_cost = self.transfer_error_rates.get(transfer_key, 0.01) * 100  # Scale up for cost calculation
+        # Transfer time plus scaled error rate (defaults for unknown pairs)
+        static_cost = self._static_costs.get((source_name, target_name))
+        if static_cost is None:
+            static_cost = self._static_transfer_cost(source_name, target_name)
         
-        # Consider target memory level utilization (higher utilization = higher cost)
-        target_level_obj = self.get_level(target_name)
-        utilization_cost = target_level_obj.utilization * 5 if target_level_obj else 0
+        # Target level utilization and coherence time (defaults for unknown levels)
+        target_level_obj = self.levels.get(target_name)
+        if target_level_obj is not None:
+            target_coherence = target_level_obj.coherence_time
+            target_utilization = target_level_obj.utilization
+        else:
+            target_coherence = 100
+            target_utilization = 0
         
-        # If qubit is provided, consider qubit-specific factors
-        qubit_specific_cost = 0
         if qubit:
-            # Consider coherence time of the qubit compared to target level
-            target_coherence = target_level_obj.coherence_time if target_level_obj else 100
-            coherence_ratio = target_coherence / qubit.coherence_time if qubit.coherence_time else 1
+            qubit_coherence = qubit.coherence_time or 0
+            gate_count = getattr(qubit, "gate_count", 0)
+        else:
+            qubit_coherence = 0
+            gate_count = 0
+        
+        return _transfer_cost_core(static_cost, target_coherence, target_utilization, target_name == "L1",
+                                   bool(qubit), qubit_coherence, gate_count)
+    
+    def _batch_transfer_costs(self, sources, targets, qubits):
+        """
+        Computes get_transfer_cost for several transfers in one kernel call
+        
+        Args:
+            sources: Source level names (must exist in the hierarchy)
+            targets: Target level names (must exist in the hierarchy)
+            qubits: Qubit (or None) for each transfer
             
-            # If the target coherence is much higher than needed, it's wasteful (higher cost)
-            if coherence_ratio > 5:
-                qubit_specific_cost += (coherence_ratio - 5) * 0.5
-                
-            # If the qubit has high activity, L1 is preferred (lower cost)
-            if target_name == "L1" and hasattr(qubit, "gate_count") and qubit.gate_count > 10:
-                qubit_specific_cost -= 2
+        Returns:
+            np.ndarray: Cost per transfer
+        """
+        if self._cost_tables_dirty:
+            self._refresh_cost_tables()
+        
+        level_index = self._level_index
+        levels = self.levels.values()
         
-        # Calculate total cost
-        total_cost = base_time_cost + error_cost + utilization_cost + qubit_specific_cost
+        source_index = np.array([level_index[name] for name in sources], dtype=np.int64)
+        target_index = np.array([level_index[name] for name in targets], dtype=np.int64)
+        has_qubit = np.array([bool(qubit) for qubit in qubits], dtype=np.bool_)
+        qubit_coherence = np.array([(qubit.coherence_time or 0) if qubit else 0 for qubit in qubits], dtype=float)
+        gate_count = np.array([getattr(qubit, "gate_count", 0) if qubit else 0 for qubit in qubits], dtype=np.int64)
+        coherence_times = np.array([level.coherence_time for level in levels], dtype=float)
+        utilizations = np.array([level.utilization for level in levels], dtype=float)
         
-        return max(0, total_cost)  # Ensure cost is non-negative
+        return _transfer_cost_rows(source_index, target_index, has_qubit, qubit_coherence, gate_count,
+                                   self._static_cost_matrix, coherence_times, utilizations,
+                                   level_index.get("L1", -1))
     
     def find_optimal_level(self, qubit, current_operation=None, future_operations=None):
         """
@@ -475,23 +812,34 @@ class MemoryHierarchy:
             str: Name of the optimal memory level for this qubit
         """
         # Get current level
-        current_level = qubit.memory_level.name if hasattr(qubit.memory_level, "name") else qubit.memory_level
+        current_level = getattr(qubit.memory_level, "name", qubit.memory_level)
         
         # If no future operations, keep qubit in current level
         if not future_operations:
             return current_level
+        
+        return self._select_level(current_level, current_operation, future_operations[0], len(future_operations))
+    
+    def _select_level(self, current_level, current_operation, next_operation, future_count):
+        """
+        Level selection rule shared by find_optimal_level and optimize_memory_allocation
+        
+        Args:
+            current_level: Name of the qubit's current memory level
+            current_operation: Most recent operation on the qubit (or None)
+            next_operation: First upcoming operation on the qubit (or None)
+            future_count: Number of upcoming operations on the qubit
             
-        # Count operations by type
-        op_counts = {}
-        for op in future_operations:
-            op_type = getattr(op, "type", None)
-            if op_type:
-                op_counts[op_type] = op_counts.get(op_type, 0) + 1
+        Returns:
+            str: Name of the optimal memory level
+        """
+        if not future_count:
+            return current_level
         
         # Calculate idle time until next operation
         idle_time = 0
-        if future_operations and hasattr(future_operations[0], "time") and current_operation and hasattr(current_operation, "time"):
-            idle_time = future_operations[0].time - (current_operation.time + getattr(current_operation, "duration", 0))
+        if next_operation and hasattr(next_operation, "time") and current_operation and hasattr(current_operation, "time"):
+            idle_time = next_operation.time - (current_operation.time + getattr(current_operation, "duration", 0))
         
         # Determine best level based on operations and idle time
         if idle_time > 100:
@@ -500,13 +848,43 @@ class MemoryHierarchy:
         elif idle_time > 20:
             # Medium idle time, prefer L2
             return "L2"
-        elif sum(op_counts.values()) > 5:
+        elif future_count > 5:
             # Many upcoming operations, prefer L1 for fast access
             return "L1"
         
         # By default, keep in current level
         return current_level
     
+    @staticmethod
+    def _split_gates(gates, time_point):
+        """
+        Splits a qubit's gates around a time point in a single pass
+        
+        Args:
+            gates: Gates acting on the qubit
+            time_point: Time point to split at
+            
+        Returns:
+            tuple: (most recent gate, first upcoming gate, number of upcoming gates)
+        """
+        current_op = None
+        next_op = None
+        next_time = float('inf')
+        future_count = 0
+        
+        for gate in gates:
+            gate_time = gate.time
+            if gate_time <= time_point:
+                if current_op is None or gate_time > current_op.time:
+                    current_op = gate
+            else:
+                future_count += 1
+                if gate_time < next_time:
+                    next_time = gate_time
+                    next_op = gate
+        
+        return current_op, next_op, future_count
+    
     def smart_transfer(self, qubit, recommended_level=None, context=None):
         """
         Intelligently transfers a qubit to the optimal memory level
@@ -520,7 +898,7 @@ class MemoryHierarchy:
             tuple: (success, transfer_time, target_level)
         """
         # Get current level
-        current_level = qubit.memory_level.name if hasattr(qubit.memory_level, "name") else qubit.memory_level
+        current_level = getattr(qubit.memory_level, "name", qubit.memory_level)
         
         # If recommended level is provided, use it, otherwise find optimal level
         if recommended_level:
@@ -534,20 +912,33 @@ class MemoryHierarchy:
         if current_level == target_level:
             return True, 0, target_level
         
-        # Calculate direct transfer cost
-        direct_cost = self.get_transfer_cost(current_level, target_level, qubit)
+        # Skip the path search when no intermediate level can shorten the route
+        if self._cost_tables_dirty:
+            self._refresh_cost_tables()
+        if (current_level, target_level) not in self._indirect_useful:
+            success, time = self.transfer_qubit(qubit, target_level)
+            return success, time, target_level
         
-        # Check if indirect transfer through intermediate level is more efficient
-        indirect_costs = {}
-        for intermediate in ["L1", "L2", "L3"]:
-            if intermediate != current_level and intermediate != target_level:
-                first_leg_cost = self.get_transfer_cost(current_level, intermediate, qubit)
-                second_leg_cost = self.get_transfer_cost(intermediate, target_level, qubit)
-                indirect_costs[intermediate] = first_leg_cost + second_leg_cost
+        # Cost the direct path and both legs of every path through L1/L2/L3 in
+        # a single kernel call
+        intermediates = [name for name in ("L1", "L2", "L3") if name != current_level and name != target_level]
+        path_count = len(intermediates)
+        costs = self._batch_transfer_costs(
+            [current_level] * (1 + path_count) + intermediates,
+            [target_level] + intermediates + [target_level] * path_count,
+            [qubit] * (1 + 2 * path_count)
+        )
+        direct_cost = float(costs[0])
+        indirect_costs = costs[1:1 + path_count] + costs[1 + path_count:]
         
         # Find minimum cost path
-        min_indirect_cost = min(indirect_costs.values()) if indirect_costs else float('inf')
-        best_intermediate = min(indirect_costs, key=indirect_costs.get) if indirect_costs else None
+        if path_count:
+            best_path = int(np.argmin(indirect_costs))
+            min_indirect_cost = float(indirect_costs[best_path])
+            best_intermediate = intermediates[best_path]
+        else:
+            min_indirect_cost = float('inf')
+            best_intermediate = None
         
         # Compare direct vs indirect
         if min_indirect_cost < direct_cost * 0.8:  # Only use indirect if significantly better
@@ -585,46 +976,78 @@ class MemoryHierarchy:
             "total_cost_saved": 0
         }
         
-        # For each qubit, determine if it's in the optimal level
+        # Hot-loop lookups bound to locals
+        get_gates_by_qubit = circuit.get_gates_by_qubit
+        split_gates = self._split_gates
+        select_level = self._select_level
+        smart_transfer = self.smart_transfer
+        levels = self.levels
+        
+        # First pass: decide, for each qubit, whether it should move without
+        # touching the hierarchy so earlier moves do not skew later decisions
+        moves = []
         processed_qubits = set()
         for qubit in circuit.qubits:
             if qubit in processed_qubits or not qubit.is_active:
                 continue
                 
-            # Get upcoming operations for this qubit
-            future_gates = [g for g in circuit.get_gates_by_qubit(qubit) if g.time > time_point]
-            future_gates.sort(key=lambda g: g.time)
-            
-            # Find most recent operation
-            prev_gates = [g for g in circuit.get_gates_by_qubit(qubit) if g.time <= time_point]
-            current_op = max(prev_gates, key=lambda g: g.time) if prev_gates else None
+            # Most recent and upcoming operations for this qubit
+            current_op, next_op, future_count = split_gates(get_gates_by_qubit(qubit), time_point)
             
             # Build context for decision making
             context = {
                 "current_operation": current_op,
-                "future_operations": future_gates,
                 "time_point": time_point
             }
             
             # Determine optimal level based on operation pattern
-            current_level = qubit.memory_level.name if hasattr(qubit.memory_level, "name") else qubit.memory_level
-            optimal_level = self.find_optimal_level(qubit, current_op, future_gates)
+            current_level = getattr(qubit.memory_level, "name", qubit.memory_level)
+            optimal_level = select_level(current_level, current_op, next_op, future_count)
             
-            # If qubit isn't in optimal level, transfer it
+            # If qubit isn't in optimal level, consider transferring it
+            # (_select_level only changes level when operations are upcoming)
             if current_level != optimal_level:
-                current_cost = self.get_transfer_cost(current_level, "L1", qubit) if future_gates else 0
-                optimal_cost = self.get_transfer_cost(optimal_level, "L1", qubit) if future_gates else 0
-                
-                # Only transfer if there's significant benefit
-                if optimal_cost < current_cost * 0.7:
-                    success, transfer_time, actual_level = self.smart_transfer(qubit, optimal_level, context)
-                    
-                    if success:
-                        actions["transfers"] += 1
-                        actions["qubits_affected"] += 1
-                        actions["total_transfer_time"] += transfer_time
-                        actions["total_cost_saved"] += (current_cost - optimal_cost)
+                moves.append((qubit, current_level, optimal_level, context))
                         
             processed_qubits.add(qubit)
+        
+        # Cost of reaching L1 from the current and from the optimal level for
+        # all considered moves, computed in one batch
+        candidates = []
+        if moves:
+            move_count = len(moves)
+            move_qubits = [move[0] for move in moves]
+            costs = self._batch_transfer_costs(
+                [move[1] for move in moves] + [move[2] for move in moves],
+                ["L1"] * (2 * move_count),
+                move_qubits + move_qubits
+            )
+            
+            for (qubit, current_level, optimal_level, context), current_cost, optimal_cost in zip(
+                    moves, costs[:move_count].tolist(), costs[move_count:].tolist()):
+                # Only transfer if there's significant benefit
+                if optimal_cost < current_cost * 0.7:
+                    candidates.append((current_cost - optimal_cost, qubit, current_level, optimal_level, context))
+        
+        # Second pass: execute the most profitable moves first, skipping those
+        # whose target level has no room left instead of attempting them
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        remaining_capacity = {name: level.available_capacity for name, level in levels.items()}
+        
+        for cost_saved, qubit, current_level, optimal_level, context in candidates:
+            if remaining_capacity.get(optimal_level, 0) <= 0:
+                continue
+            
+            success, transfer_time, actual_level = smart_transfer(qubit, optimal_level, context)
+            
+            if success:
+                for name in (current_level, optimal_level):
+                    if name in levels:
+                        remaining_capacity[name] = levels[name].available_capacity
+                
+                actions["transfers"] += 1
+                actions["qubits_affected"] += 1
+                actions["total_transfer_time"] += transfer_time
+                actions["total_cost_saved"] += cost_saved
             
         return actions 
\ No newline at end of file
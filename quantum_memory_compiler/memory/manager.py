@@ -26,46 +26,168 @@ Bellek Yöneticisi modülü
 Kuantum bellek hiyerarşisini yöneten ve qubit tahsisini optimize eden sınıf.
 """
 
+import heapq
 import logging
-from collections import defaultdict
+import math
+from collections import deque
+
+import numpy as np
 
 from ..core.qubit import Qubit, QubitType, MemoryLevel as QubitMemLevel
 from .hierarchy import MemoryHierarchy
 from .allocation import QubitAllocator
 
 
+# Bellek seviyesi adı -> Qubit MemoryLevel enum değeri
+_MEMLEVEL_MAP = {level.name: level for level in QubitMemLevel}
+
+# Standart bellek seviyesi adı <-> küçük tamsayı kodu eşleştirmesi (0: seviye yok);
+# her yönetici bu tabloyu hiyerarşideki özel seviyelerle genişletir
+_LEVEL_CODES = {name: level.value for name, level in _MEMLEVEL_MAP.items()}
+_LEVEL_NAMES = [None] * (max(_LEVEL_CODES.values()) + 1)
+for _name, _code in _LEVEL_CODES.items():
+    _LEVEL_NAMES[_code] = _name
+
+# Erişim deseni tahmini: qubit başına saklanan son erişim aralığı sayısı ve
+# aralıkların "sabit adımlı" (streaming) sayılması için izin verilen göreli sapma
+_DELTA_WINDOW = 4
+_STREAM_TOLERANCE = 0.25
+
+# Transfer zamanlama çarkının tik sayısı (bu ufkun ötesindeki veya tamsayı
+# olmayan zamanlı transferler taşma yığınında tutulur)
+_WHEEL_SIZE = 64
+
+
 class MemoryManager:
     """Kuantum bellek hiyerarşisini yöneten ve qubit'leri tahsis eden sınıf"""
     
-    def __init__(self, memory_hierarchy, allocator_strategy="lifetime"):
+    def __init__(self, memory_hierarchy, allocator_strategy="lifetime", max_qubits_per_pass=None,
+                 prefetch=False, initial_capacity=1024):
         """
         MemoryManager nesnesini başlatır
         
         Args:
             memory_hierarchy: MemoryHierarchy nesnesi
             allocator_strategy: Kullanılacak tahsis stratejisi ("static", "lifetime", "dynamic")
+            max_qubits_per_pass: Tek bir optimize_memory çağrısında incelenecek en fazla
+                qubit sayısı (None: sınırsız). Kalanlar sonraki çağrılarda sırayla ele alınır.
+            prefetch: Sabit aralıklarla erişilen qubit'leri bir sonraki erişimlerinden
+                önce en hızlı seviyeye taşıyan tahminci etkin mi? (varsayılan: kapalı)
+            initial_capacity: Kimlik dizilerinin başlangıç boyutu; aşıldığında
+                kapasite iki katına çıkarılır
         """
         self.memory_hierarchy = memory_hierarchy
         self.allocator_strategy = allocator_strategy
+        self.max_qubits_per_pass = max_qubits_per_pass
+        self.prefetch = prefetch
         
         # Qubit tahsis stratejisini oluştur
         self.allocator = QubitAllocator.create(allocator_strategy)
         
         # Qubit izleme verileri
-        self.active_qubits = set()        # Şu anda aktif olan qubit'ler
-        self.qubit_levels = {}            # Qubit -> bellek seviyesi eşleştirmesi
-        self.qubit_usage_times = {}       # Qubit -> (başlangıç zamanı, son kullanım zamanı)
-        self.qubit_access_frequency = {}  # Qubit -> erişim sayısı
+        self._active_count = 0            # Şu anda aktif olan qubit sayısı
+        self._next_id = 0                 # Hiç kullanılmamış ilk qubit kimliği
+        self._free_ids = deque()          # Serbest bırakılan, yeniden kullanılabilir kimlikler
+        
+        # qubit.id ile indekslenen SoA izleme dizileri
+        self._capacity = 0
+        self._active = np.zeros(0, dtype=bool)          # Kimlik şu anda aktif mi?
+        self._qubits = np.empty(0, dtype=object)        # Kimliği tutan canlı Qubit nesnesi
+        self._level_of = np.zeros(0, dtype=np.int8)     # Bellek seviyesi kodu (0: yok)
+        self._start = np.zeros(0, dtype=np.float64)     # Başlangıç zamanı
+        self._last = np.zeros(0, dtype=np.float64)      # Son kullanım zamanı
+        self._freq = np.zeros(0, dtype=np.int64)        # Erişim sayısı
+        self._delta_hist = np.zeros((0, _DELTA_WINDOW), dtype=np.float64)  # Son erişim aralıkları (halka)
+        self._grow(max(1, initial_capacity))
+        
+        # Seviye adı <-> kod tabloları ve kod başına aktif qubit sayısı
+        self._level_codes = dict(_LEVEL_CODES)
+        self._level_names = list(_LEVEL_NAMES)
+        self._level_counts = np.zeros(len(_LEVEL_NAMES), dtype=np.int64)
+        for level_name in memory_hierarchy.levels:
+            self._level_code(level_name)
         
         # Bellek optimizasyonu verileri
-        self.transfer_queue = []       # Yaklaşan transferler listesi: (qubit, hedef seviye, zaman)
+        # Yaklaşan transferler (zaman, sıra no, qubit, hedef seviye): yakın ufuktaki tamsayı
+        # zamanlı transferler tik başına bir deque'lik çarkta, diğerleri min-heap'te
+        self._wheel = [deque() for _ in range(_WHEEL_SIZE)]
+        self._wheel_time = 0           # Çarkta henüz işlenmemiş ilk tik
+        self._wheel_count = 0          # Çarktaki transfer sayısı
+        self._overflow = []            # Ufuk dışı / geçmiş / tamsayı olmayan zamanlı transferler
+        self._transfer_seq = 0         # Aynı zamanlı transferlerde FIFO sırasını koruyan sayaç
         self.current_time = 0          # Simülasyon zamanı
         self.optimization_interval = 10 # Bellek optimizasyonu aralığı (simülasyon zaman birimi)
         self.last_optimization_time = 0 # Son optimizasyon zamanı
+        self._opt_cursor = 0           # max_qubits_per_pass ile bölünen taramanın kaldığı yer
         
         # Loglar
         self.logger = logging.getLogger("MemoryManager")
         self.logger.setLevel(logging.INFO)
+        self._dbg = self.logger.isEnabledFor(logging.DEBUG)  # Debug kayıtları biçimlendirilsin mi?
+    
+    def _grow(self, needed):
+        """
+        SoA dizilerini en az `needed` qubit'i tutacak şekilde geometrik olarak büyütür
+        
+        Args:
+            needed: Gereken minimum kapasite
+        """
+        if needed <= self._capacity:
+            return
+        
+        new_capacity = max(needed, self._capacity * 2)
+        for attr in ("_active", "_qubits", "_level_of", "_start", "_last", "_freq", "_delta_hist"):
+            old = getattr(self, attr)
+            shape = (new_capacity,) + old.shape[1:]
+            new = np.zeros(shape, dtype=old.dtype) if old.dtype != object else np.empty(shape, dtype=object)
+            new[:self._capacity] = old
+            setattr(self, attr, new)
+        self._capacity = new_capacity
+    
+    def _level_code(self, level_name):
+        """
+        Seviye adının kodunu döndürür; bilinmeyen adlara yeni kod atar
+        
+        Hiyerarşiye sonradan eklenen (add_level) seviyeler ilk kullanımda
+        tabloya eklenir.
+        
+        Args:
+            level_name: Bellek seviyesi adı
+            
+        Returns:
+            int: Seviye kodu
+        """
+        code = self._level_codes.get(level_name)
+        if code is None:
+            code = len(self._level_names)
+            self._level_codes[level_name] = code
+            self._level_names.append(level_name)
+            self._level_counts = np.append(self._level_counts, 0)
+            if code > np.iinfo(self._level_of.dtype).max:
+                self._level_of = self._level_of.astype(np.int32)
+        return code
+    
+    def _is_active(self, qubit):
+        """
+        Qubit'in bu yöneticide aktif olup olmadığını kimlik dizisi üzerinden kontrol eder
+        
+        Kimlikler yeniden kullanıldığından, eski bir Qubit tanıtıcısının aynı kimliği
+        taşıyan yeni qubit ile karıştırılmaması için nesne kimliği de karşılaştırılır.
+        
+        Args:
+            qubit: Kontrol edilecek qubit
+            
+        Returns:
+            bool: Qubit aktif mi?
+        """
+        qubit_id = qubit.id
+        return (0 <= qubit_id < self._capacity and self._active[qubit_id]
+                and self._qubits[qubit_id] is qubit)
+    
+    @property
+    def active_qubits(self):
+        """Şu anda aktif olan qubit'lerin listesi (kimlik sırasıyla)"""
+        return self._qubits[np.flatnonzero(self._active[:self._next_id])].tolist()
     
     def allocate_qubit(self, level_name="L1"):
         """
@@ -77,19 +199,32 @@ class MemoryManager:
         Returns:
             Qubit: Tahsis edilen qubit veya None (başarısızsa)
         """
-        # Yeni qubit oluştur
-        qubit_id = len(self.active_qubits)
-        qubit = Qubit(qubit_id, QubitType.LOGICAL, getattr(QubitMemLevel, level_name))
+        # Yeni qubit oluştur (önce serbest bırakılmış kimlikleri yeniden kullan,
+        # böylece kimlik uzayı ve SoA dizileri yoğun kalır)
+        reused = bool(self._free_ids)
+        qubit_id = self._free_ids[0] if reused else self._next_id
+        qubit = Qubit(qubit_id, QubitType.LOGICAL, _MEMLEVEL_MAP[level_name])
         
         # Bellek seviyesinde tahsis et
         if self.memory_hierarchy.allocate_qubit(qubit, level_name):
             # Başarılı tahsis
-            self.active_qubits.add(qubit)
-            self.qubit_levels[qubit] = level_name
-            self.qubit_usage_times[qubit] = (self.current_time, self.current_time)
-            self.qubit_access_frequency[qubit] = 1
+            if reused:
+                self._free_ids.popleft()
+            else:
+                self._next_id += 1
+                self._grow(qubit_id + 1)
+            self._active[qubit_id] = True
+            self._qubits[qubit_id] = qubit
+            self._active_count += 1
+            level_code = self._level_code(level_name)
+            self._level_of[qubit_id] = level_code
+            self._level_counts[level_code] += 1
+            self._start[qubit_id] = self.current_time
+            self._last[qubit_id] = self.current_time
+            self._freq[qubit_id] = 1
             
-            self.logger.debug(f"Qubit {qubit.id} allocated at level {level_name}")
+            if self._dbg:
+                self.logger.debug("Qubit %s allocated at level %s", qubit.id, level_name)
             return qubit
         
         self.logger.warning(f"Failed to allocate qubit at level {level_name}")
@@ -106,7 +241,47 @@ class MemoryManager:
         Returns:
             list: Tahsis edilen qubit'ler listesi
         """
-        return [self.allocate_qubit(level_name) for _ in range(n)]
+        if n <= 0:
+            return []
+        
+        # Kimlikleri önce serbest listeden, sonra yeni kimliklerden ayır
+        memory_level = _MEMLEVEL_MAP[level_name]
+        reused_count = min(n, len(self._free_ids))
+        qubit_ids = [self._free_ids[i] for i in range(reused_count)]
+        qubit_ids.extend(range(self._next_id, self._next_id + n - reused_count))
+        qubits = [Qubit(qubit_id, QubitType.LOGICAL, memory_level) for qubit_id in qubit_ids]
+        
+        # Tek hiyerarşi çağrısıyla tahsis et; kapasiteye sığan önek başarılı olur
+        allocated = self.memory_hierarchy.allocate_qubits_bulk(qubits, level_name)
+        
+        if allocated:
+            # Kullanılan kimlikleri tüket
+            used_reused = min(allocated, reused_count)
+            for _ in range(used_reused):
+                self._free_ids.popleft()
+            self._next_id += allocated - used_reused
+            self._grow(self._next_id)
+            
+            # SoA dizilerini toplu olarak güncelle
+            ids = np.array(qubit_ids[:allocated], dtype=np.int64)
+            level_code = self._level_code(level_name)
+            self._level_of[ids] = level_code
+            self._level_counts[level_code] += allocated
+            self._start[ids] = self.current_time
+            self._last[ids] = self.current_time
+            self._freq[ids] = 1
+            self._active[ids] = True
+            for qubit in qubits[:allocated]:
+                self._qubits[qubit.id] = qubit
+            self._active_count += allocated
+            
+            if self._dbg:
+                self.logger.debug("%d qubits allocated at level %s", allocated, level_name)
+        
+        if allocated < n:
+            self.logger.warning("Failed to allocate %d qubits at level %s", n - allocated, level_name)
+        
+        return qubits[:allocated] + [None] * (n - allocated)
     
     def deallocate_qubit(self, qubit):
         """
@@ -118,22 +293,21 @@ class MemoryManager:
         Returns:
             bool: İşlem başarılı oldu mu?
         """
-        if qubit not in self.active_qubits:
+        if not self._is_active(qubit):
             self.logger.warning(f"Qubit {qubit.id} is not active, cannot deallocate")
             return False
         
         if self.memory_hierarchy.deallocate_qubit(qubit):
             # Başarılı serbest bırakma
-            self.active_qubits.remove(qubit)
-            
-            if qubit in self.qubit_levels:
-                del self.qubit_levels[qubit]
-            if qubit in self.qubit_usage_times:
-                del self.qubit_usage_times[qubit]
-            if qubit in self.qubit_access_frequency:
-                del self.qubit_access_frequency[qubit]
+            self._active[qubit.id] = False
+            self._qubits[qubit.id] = None
+            self._active_count -= 1
+            self._level_counts[self._level_of[qubit.id]] -= 1
+            self._level_of[qubit.id] = 0
+            self._free_ids.append(qubit.id)
             
-            self.logger.debug(f"Qubit {qubit.id} deallocated")
+            if self._dbg:
+                self.logger.debug("Qubit %s deallocated", qubit.id)
             return True
         
         self.logger.warning(f"Failed to deallocate qubit {qubit.id}")
@@ -149,7 +323,9 @@ class MemoryManager:
         Returns:
             str: Bellek seviyesi adı veya None
         """
-        return self.qubit_levels.get(qubit)
+        if not self._is_active(qubit):
+            return None
+        return self._level_names[self._level_of[qubit.id]]
     
     def update_qubit_usage(self, qubit, time):
         """
@@ -159,19 +335,23 @@ class MemoryManager:
             qubit: Güncellenen qubit
             time: Kullanım zamanı
         """
-        if qubit not in self.active_qubits:
-            self.logger.warning(f"Qubit {qubit.id} is not active, cannot update usage")
+        qubit_id = qubit.id
+        if not (0 <= qubit_id < self._capacity and self._active[qubit_id]
+                and self._qubits[qubit_id] is qubit):
+            self.logger.warning(f"Qubit {qubit_id} is not active, cannot update usage")
             return
         
-        # Qubit'in son kullanım zamanını güncelle
-        start_time, _ = self.qubit_usage_times.get(qubit, (time, time))
-        self.qubit_usage_times[qubit] = (start_time, time)
-        
-        # Erişim frekansını artır
-        self.qubit_access_frequency[qubit] = self.qubit_access_frequency.get(qubit, 0) + 1
-        
-        # Qubit'in son kullanım zamanını güncelle
-        qubit.update_usage_time(time)
+        # Erişim aralığını halka tampona yaz, son kullanım zamanını güncelle
+        # ve erişim frekansını artır
+        freq = self._freq[qubit_id]
+        self._delta_hist[qubit_id, freq % _DELTA_WINDOW] = time - self._last[qubit_id]
+        self._last[qubit_id] = time
+        self._freq[qubit_id] = freq + 1
+        
+        # Qubit nesnesindeki kopya yalnızca zaman ilerlediğinde değişir
+        # (Qubit'in kendi koherens hesapları bu alanı okur)
+        if time > qubit.last_usage_time and qubit.is_active:
+            qubit.last_usage_time = time
     
     def transfer_qubit(self, qubit, target_level):
         """
@@ -184,23 +364,37 @@ class MemoryManager:
         Returns:
             tuple: (başarı durumu, transfer süresi)
         """
-        if qubit not in self.active_qubits:
-            self.logger.warning(f"Qubit {qubit.id} is not active, cannot transfer")
+        # Aynı seviyeye transfer en sık yoldur: iki dizi okumasıyla bitir.
+        # Sıfırdan farklı seviye kodu ve eşleşen nesne, qubit'in aktif olduğunu gösterir.
+        qubit_id = qubit.id
+        current_code = self._level_of[qubit_id] if 0 <= qubit_id < self._capacity else 0
+        if (current_code and current_code == self._level_codes.get(target_level)
+                and self._qubits[qubit_id] is qubit):
+            return True, 0
+        
+        if not self._is_active(qubit):
+            self.logger.warning(f"Qubit {qubit_id} is not active, cannot transfer")
             return False, 0
         
-        current_level = self.qubit_levels.get(qubit)
-        if current_level == target_level:
-            return True, 0
+        current_level = self._level_names[current_code]
+        if self._dbg:
+            self.logger.debug("Transferring qubit %s from %s to %s", qubit.id, current_level, target_level)
         
-        self.logger.debug(f"Transferring qubit {qubit.id} from {current_level} to {target_level}")
+        # Hedef kodunu hiyerarşi çağrısından önce çöz; transfer başarılı olduktan
+        # sonra yönetici ile hiyerarşi arasında tutarsızlık oluşamaz
+        target_code = self._level_code(target_level)
         
         # Transferi gerçekleştir
         success, transfer_time = self.memory_hierarchy.transfer_qubit(qubit, target_level)
         
         if success:
             # Qubit'in bellek seviyesini güncelle
-            self.qubit_levels[qubit] = target_level
-            self.logger.debug(f"Qubit {qubit.id} transferred to {target_level} in {transfer_time} time units")
+            self._level_counts[current_code] -= 1
+            self._level_of[qubit_id] = target_code
+            self._level_counts[target_code] += 1
+            if self._dbg:
+                self.logger.debug("Qubit %s transferred to %s in %s time units",
+                                  qubit.id, target_level, transfer_time)
         else:
             self.logger.warning(f"Failed to transfer qubit {qubit.id} to {target_level}")
         
@@ -215,10 +409,68 @@ class MemoryManager:
             target_level: Hedef bellek seviyesi
             scheduled_time: Transfer zamanı
         """
-        self.transfer_queue.append((qubit, target_level, scheduled_time))
-        self.transfer_queue.sort(key=lambda x: x[2])  # Zamana göre sırala
+        # Sıra numarası eşit zamanlarda Qubit nesnelerinin karşılaştırılmasını önler
+        entry = (scheduled_time, self._transfer_seq, qubit, target_level)
+        self._transfer_seq += 1
+        
+        # Ufuk içindeki tamsayı zamanlar O(1) ile çarktaki kovaya eklenir
+        tick = int(scheduled_time)
+        if tick == scheduled_time and self._wheel_time <= tick < self._wheel_time + _WHEEL_SIZE:
+            self._wheel[tick % _WHEEL_SIZE].append(entry)
+            self._wheel_count += 1
+        else:
+            heapq.heappush(self._overflow, entry)
+        
+        if self._dbg:
+            self.logger.debug("Queued transfer of qubit %s to %s at time %s",
+                              qubit.id, target_level, scheduled_time)
+    
+    @property
+    def transfer_queue(self):
+        """Bekleyen transferlerin (zaman, sıra no, qubit, hedef seviye) sıralı listesi"""
+        entries = list(self._overflow)
+        for bucket in self._wheel:
+            entries.extend(bucket)
+        return sorted(entries, key=lambda entry: entry[:2])
+    
+    @property
+    def pending_transfer_count(self):
+        """Bekleyen transfer sayısı"""
+        return self._wheel_count + len(self._overflow)
+    
+    def _pop_ready_transfers(self, current_time):
+        """
+        Zamanı gelmiş transferleri (zaman, sıra no) sırasıyla kuyruktan çıkarır
         
-        self.logger.debug(f"Queued transfer of qubit {qubit.id} to {target_level} at time {scheduled_time}")
+        Çark tik tik yürünür; her tikte önce daha erken zamanlı taşma girdileri,
+        ardından aynı tikteki kova ve taşma girdileri sıra numarasına göre
+        birleştirilerek verilir. Çark boşaldığında kalan tikler atlanır.
+        
+        Args:
+            current_time: Şu anki zaman
+            
+        Yields:
+            tuple: (qubit, hedef seviye)
+        """
+        wheel, overflow = self._wheel, self._overflow
+        tick = self._wheel_time
+        last_tick = math.floor(current_time)
+        
+        while self._wheel_count and tick <= last_tick:
+            bucket = wheel[tick % _WHEEL_SIZE]
+            while overflow and overflow[0][0] < tick:
+                yield heapq.heappop(overflow)[2:]
+            while bucket:
+                if overflow and overflow[0][:2] < bucket[0][:2]:
+                    yield heapq.heappop(overflow)[2:]
+                else:
+                    self._wheel_count -= 1
+                    yield bucket.popleft()[2:]
+            tick += 1
+        self._wheel_time = max(tick, last_tick + 1)
+        
+        while overflow and overflow[0][0] <= current_time:
+            yield heapq.heappop(overflow)[2:]
     
     def process_transfers(self, current_time):
         """
@@ -233,23 +485,75 @@ class MemoryManager:
         self.current_time = current_time
         transfers_processed = 0
         
-        # Transfer kuyruğundaki işlemleri kontrol et
-        pending_transfers = []
-        
-        for qubit, target_level, scheduled_time in self.transfer_queue:
-            if scheduled_time <= current_time:
-                # Transferi gerçekleştir
-                success, transfer_time = self.transfer_qubit(qubit, target_level)
-                if success:
+        # Zamanı gelmiş transferleri kuyruğun başından çek; aynı (kaynak, hedef)
+        # çiftine giden ardışık transferler tek hiyerarşi çağrısında birleştirilir.
+        # Yalnızca ardışık olanların birleştirilmesi sıralı işlemle aynı sonucu verir.
+        run, run_ids, run_key = [], set(), None
+        for qubit, target_level in self._pop_ready_transfers(current_time):
+            
+            # Aynı qubit grupta zaten varsa önce grubu işle (seviyesi değişecek)
+            if qubit.id in run_ids:
+                transfers_processed += self._transfer_run(run, run_key)
+                run, run_ids, run_key = [], set(), None
+            
+            # Aktif olmayan qubit'ler tek tek işlenir (uyarı + başarısızlık). Özel
+            # seviyelerdeki qubit'lerin memory_level alanı güncellenmediğinden
+            # hiyerarşi onları başka bir seviyede görür; bunlar da sıralı işlemle
+            # aynı sonucu vermek için tek tek işlenir.
+            if (not self._is_active(qubit) or getattr(qubit.memory_level, "name", qubit.memory_level)
+                    != self._level_names[self._level_of[qubit.id]]):
+                transfers_processed += self._transfer_run(run, run_key)
+                run, run_ids, run_key = [], set(), None
+                if self.transfer_qubit(qubit, target_level)[0]:
                     transfers_processed += 1
-            else:
-                # Henüz zamanı gelmemiş transferler
-                pending_transfers.append((qubit, target_level, scheduled_time))
+                continue
+            
+            key = (self._level_of[qubit.id], target_level)
+            if key != run_key:
+                transfers_processed += self._transfer_run(run, run_key)
+                run, run_ids, run_key = [], set(), key
+            run.append(qubit)
+            run_ids.add(qubit.id)
+        
+        transfers_processed += self._transfer_run(run, run_key)
+        return transfers_processed
+    
+    def _transfer_run(self, qubits, run_key):
+        """
+        Aynı kaynak seviyeden aynı hedef seviyeye giden aktif qubit'leri toplu taşır
         
-        # Kuyruğu güncelle
-        self.transfer_queue = pending_transfers
+        Args:
+            qubits: Taşınacak qubit'ler
+            run_key: (kaynak seviye kodu, hedef seviye adı)
+            
+        Returns:
+            int: Başarılı transfer sayısı
+        """
+        if not qubits:
+            return 0
         
-        return transfers_processed
+        source_code, target_level = run_key
+        source_level = self._level_names[source_code]
+        if source_level == target_level:
+            return len(qubits)
+        
+        # Hedef kodunu hiyerarşi çağrısından önce çöz (bkz. transfer_qubit)
+        target_code = self._level_code(target_level)
+        
+        moved, transfer_time = self.memory_hierarchy.transfer_qubits_bulk(qubits, source_level, target_level)
+        if moved:
+            ids = np.fromiter((qubit.id for qubit in qubits[:moved]), dtype=np.int64, count=moved)
+            self._level_of[ids] = target_code
+            self._level_counts[source_code] -= moved
+            self._level_counts[target_code] += moved
+            if self._dbg:
+                self.logger.debug("%d qubits transferred from %s to %s in %s time units each",
+                                  moved, source_level, target_level, transfer_time)
+        
+        for qubit in qubits[moved:]:
+            self.logger.warning(f"Failed to transfer qubit {qubit.id} to {target_level}")
+        
+        return moved
     
     def optimize_memory(self, circuit, current_time):
         """
@@ -268,41 +572,102 @@ class MemoryManager:
         if current_time - self.last_optimization_time < self.optimization_interval:
             return 0
         
-        self.logger.info(f"Optimizing memory at time {current_time}")
+        self.logger.info("Optimizing memory at time %s", current_time)
         self.last_optimization_time = current_time
         
-        # Her qubit için yaşam süresi analizi
-        queued_transfers = 0
-        qubit_lifetimes = {}
-        
-        for qubit in self.active_qubits:
-            # Devreden qubit yaşam süresi bilgisini al
-            start_time, end_time = circuit.get_qubit_lifetime(qubit)
-            
-            # Devrede kullanılmayan qubit'ler için yöneticiden yaşam süresi bilgisini al
-            if start_time == end_time == 0:
-                start_time, end_time = self.qubit_usage_times.get(qubit, (current_time, current_time))
+        if not self._active_count:
+            return 0
+        ids = np.flatnonzero(self._active[:self._next_id])
+        
+        # Çağrı başına işi sınırla; tarama bir sonraki çağrıda kaldığı yerden devam eder
+        max_qubits = self.max_qubits_per_pass
+        if max_qubits is not None and len(ids) > max_qubits:
+            start = self._opt_cursor % len(ids)
+            ids = np.roll(ids, -start)[:max_qubits]
+            self._opt_cursor = start + max_qubits
+        qubits = self._qubits[ids].tolist()
+        
+        # Devreden tüm qubit'lerin yaşam sürelerini tek geçişte al
+        lifetimes = np.array(circuit.get_qubit_lifetimes(qubits), dtype=np.float64).reshape(-1, 2)
+        end_times = lifetimes[:, 1]
+        
+        # Devrede kullanılmayan qubit'ler için yöneticideki son kullanım zamanını kullan
+        unused = (lifetimes[:, 0] == 0) & (end_times == 0)
+        end_times = np.where(unused, self._last[ids], end_times)
+        
+        # Kalan yaşam süresine göre en uygun seviye: hiyerarşi eşikleri üzerinde
+        # arama + seviye kodu tablosu (get_best_level_for_qubit ile aynı karar)
+        thresholds, level_names = self.memory_hierarchy.get_lifetime_thresholds()
+        level_code_lut = np.array([self._level_code(name) for name in level_names], dtype=self._level_of.dtype)
+        remaining_lifetimes = np.maximum(0, end_times - current_time)
+        best_codes = level_code_lut[np.searchsorted(thresholds, remaining_lifetimes, side='left')]
+        current_codes = self._level_of[ids]
+        schedule_times = np.full(len(ids), current_time, dtype=np.float64)
+        
+        # Yakında tekrar erişilmesi beklenen qubit'leri erişimden önce en hızlı
+        # seviyeye al; bu qubit'ler için yaşam süresi kararı geçersiz kılınır
+        if self.prefetch:
+            prefetch_mask, prefetch_times = self._predict_prefetch(ids, current_codes, level_names[0], current_time)
+            best_codes = np.where(prefetch_mask, level_code_lut[0], best_codes)
+            schedule_times = np.where(prefetch_mask, prefetch_times, schedule_times)
+        
+        # Farklı bir seviyeye taşınması gereken qubit'lerin transferlerini planla
+        move_indices = np.flatnonzero(best_codes != current_codes)
+        for index in move_indices.tolist():
+            qubit = qubits[index]
+            best_level = self._level_names[best_codes[index]]
             
-            qubit_lifetimes[qubit] = (start_time, end_time)
+            # Transferi kuyruğa ekle (şimdi veya tahmin edilen erişimden önce)
+            self.queue_transfer(qubit, best_level, schedule_times[index].item())
             
-            # Qubit yaşam süresine göre en uygun bellek seviyesini belirle
-            remaining_lifetime = max(0, end_time - current_time)
-            best_level = self.memory_hierarchy.get_best_level_for_qubit(qubit, remaining_lifetime)
-            current_level = self.qubit_levels.get(qubit)
+            if self._dbg:
+                self.logger.debug("Optimization: Qubit %s should move from %s to %s (remaining lifetime: %s)",
+                                  qubit.id, self._level_names[self._level_of[qubit.id]], best_level,
+                                  remaining_lifetimes[index])
+        
+        return len(move_indices)
+    
+    def _predict_prefetch(self, ids, current_codes, fast_level, current_time):
+        """
+        Sabit adımlı erişim desenine sahip qubit'lerin bir sonraki erişimini tahmin eder
+        
+        Son _DELTA_WINDOW erişim aralığı birbirine yakın olan qubit'ler "streaming"
+        kabul edilir; bir sonraki erişim son kullanım + ortalama aralık olarak
+        tahmin edilir. En hızlı seviyeye transfer, tahmini erişimden transfer
+        süresi kadar önce başlayacak şekilde planlanır. Zaten en hızlı seviyede
+        olan qubit'ler tahmini erişim geçene kadar orada tutulur; aksi halde
+        yaşam süresi kuralı onları erişimler arasında tekrar tekrar indirir.
+        
+        Args:
+            ids: İncelenen qubit kimlikleri
+            current_codes: Qubit'lerin şu anki seviye kodları
+            fast_level: En hızlı bellek seviyesinin adı
+            current_time: Şu anki zaman
             
-            # Eğer farklı bir seviyeye taşınması gerekiyorsa, transferi planla
-            if best_level != current_level:
-                # Taşıma zamanını belirle (şimdi veya biraz sonra)
-                transfer_time = current_time
-                
-                # Transferi kuyruğa ekle
-                self.queue_transfer(qubit, best_level, transfer_time)
-                queued_transfers += 1
-                
-                self.logger.debug(f"Optimization: Qubit {qubit.id} should move from {current_level} to {best_level} "
-                                 f"(remaining lifetime: {remaining_lifetime})")
-        
-        return queued_transfers
+        Returns:
+            tuple: (önceden taşınacak qubit maskesi, planlanan transfer zamanları)
+        """
+        deltas = self._delta_hist[ids]
+        mean_delta = deltas.mean(axis=1)
+        spread = deltas.max(axis=1) - deltas.min(axis=1)
+        streaming = ((self._freq[ids] > _DELTA_WINDOW) & (mean_delta > 0)
+                     & (spread <= _STREAM_TOLERANCE * mean_delta))
+        
+        # Kaynak seviyeye göre en hızlı seviyeye transfer süresi tablosu
+        transfer_times = self.memory_hierarchy.transfer_times
+        latency_lut = np.array([0 if name is None or name == fast_level
+                                else transfer_times.get((name, fast_level), 10)
+                                for name in self._level_names], dtype=np.float64)
+        
+        predicted_access = self._last[ids] + mean_delta
+        transfer_start = predicted_access - latency_lut[current_codes]
+        
+        # Transfer bir sonraki optimizasyon turundan önce başlamalıysa şimdi planla;
+        # en hızlı seviyedekiler tahmini erişime kadar indirilmez
+        at_fast_level = current_codes == self._level_code(fast_level)
+        mask = (streaming & (predicted_access >= current_time)
+                & ((transfer_start <= current_time + self.optimization_interval) | at_fast_level))
+        return mask, np.maximum(transfer_start, current_time)
     
     def update_time(self, time):
         """
@@ -329,44 +694,50 @@ class MemoryManager:
             dict: Bellek kullanım istatistikleri
         """
         stats = {
-            "active_qubits": len(self.active_qubits),
+            "active_qubits": self._active_count,
             "level_stats": self.memory_hierarchy.get_utilization_stats(),
             "transfer_stats": self.memory_hierarchy.get_transfer_stats(),
-            "pending_transfers": len(self.transfer_queue)
+            "pending_transfers": self.pending_transfer_count
         }
         
-        # Seviye başına qubit dağılımı
-        level_distribution = defaultdict(int)
-        for level in self.qubit_levels.values():
-            level_distribution[level] += 1
-        stats["level_distribution"] = dict(level_distribution)
+        # Seviye başına qubit dağılımı (artımlı tutulan sayaçlardan)
+        stats["level_distribution"] = {self._level_names[code]: int(count)
+                                       for code, count in enumerate(self._level_counts.tolist()) if code and count}
         
         return stats
     
     def reset(self):
         """Bellek yöneticisini sıfırlar"""
-        # Tüm aktif qubit'leri serbest bırak
-        for qubit in list(self.active_qubits):
-            self.deallocate_qubit(qubit)
-        
-        # Bellek hiyerarşisini sıfırla
+        # Bellek hiyerarşisini sıfırla; tüm tahsisler seviye başına tek seferde
+        # serbest bırakıldığından qubit'leri tek tek serbest bırakmaya gerek yok
         self.memory_hierarchy.reset()
         
         # İç durumu sıfırla
-        self.active_qubits.clear()
-        self.qubit_levels.clear()
-        self.qubit_usage_times.clear()
-        self.qubit_access_frequency.clear()
-        self.transfer_queue.clear()
+        self._active[:] = False
+        self._qubits[:] = None
+        self._active_count = 0
+        self._next_id = 0
+        self._free_ids.clear()
+        self._level_of[:] = 0
+        self._level_counts[:] = 0
+        for bucket in self._wheel:
+            bucket.clear()
+        self._wheel_time = 0
+        self._wheel_count = 0
+        self._overflow.clear()
+        self._transfer_seq = 0
         self.current_time = 0
         self.last_optimization_time = 0
+        self._opt_cursor = 0
+        
+        self._dbg = self.logger.isEnabledFor(logging.DEBUG)
         
         self.logger.info("Memory manager reset")
     
     def __str__(self):
         """Bellek yöneticisinin string temsilini döndürür"""
-        active_count = len(self.active_qubits)
-        pending_count = len(self.transfer_queue)
+        active_count = self._active_count
+        pending_count = self.pending_transfer_count
         
         return (f"MemoryManager(strategy={self.allocator_strategy}, "
                 f"active_qubits={active_count}, pending_transfers={pending_count})") 
\ No newline at end of file
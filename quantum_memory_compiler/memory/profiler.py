@@ -26,12 +26,22 @@ Memory Profiler modülü
 Kuantum bellek kullanımını izleyen ve analiz eden araçlar.
 """
 
+import bisect
+import heapq
+import math
 import time
 import numpy as np
-import matplotlib.pyplot as plt
 from enum import Enum, auto
 from collections import defaultdict, deque
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 from ..core.qubit import MemoryLevel, QubitType
+from ..core.gate import GateType
 
 
 class ProfilingEvent(Enum):
@@ -45,9 +55,182 @@ class ProfilingEvent(Enum):
     SWAP = auto()           # Qubit değişimi
 
 
+# Enum değerinden ada dönüşüm tabloları (0: değer yok)
+_LEVEL_NAMES = [None] * (max(level.value for level in MemoryLevel) + 1)
+for _level in MemoryLevel:
+    _LEVEL_NAMES[_level.value] = _level.name
+
+_GATE_NAMES = [None] * (max(gate_type.value for gate_type in GateType) + 1)
+for _gate_type in GateType:
+    _GATE_NAMES[_gate_type.value] = _gate_type.name
+
+# Enum üyesinden değere dönüşüm tabloları; olay başına .value/.name
+# öznitelik zincirlerini tek bir sözlük aramasına indirir (None -> 0)
+_LEVEL_CODES = {level: level.value for level in MemoryLevel}
+_LEVEL_CODES[None] = 0
+_GATE_CODES = {gate_type: gate_type.value for gate_type in GateType}
+_EVENT_CODES = {event: event.value for event in ProfilingEvent}
+_EVENTS = [None] * (max(_EVENT_CODES.values()) + 1)
+for _event in ProfilingEvent:
+    _EVENTS[_event.value] = _event
+
+# Olay sütunlarının başlangıç kapasitesi; dolduğunda iki katına büyütülür
+_INITIAL_EVENT_CAPACITY = 4096
+
+# Olay kaydının sütunları (SoA): (öznitelik adı, dtype)
+_EVENT_COLUMNS = (
+    ("_event_types", np.int8),      # ProfilingEvent değeri
+    ("_event_times", np.float64),   # Olay zamanı
+    ("_event_qubits", np.int64),    # Qubit kimliği (-1: yok)
+    ("_event_levels", np.int8),     # MemoryLevel değeri (0: yok)
+    ("_event_sources", np.int8),    # Kaynak seviye değeri (0: yok)
+    ("_event_targets", np.int8),    # Hedef seviye değeri (0: yok)
+    ("_event_gates", np.int16),     # GateType değeri (0: yok)
+    ("_event_plus", np.int8),       # Qubit sayısı bir artan seviye değeri (0: yok)
+    ("_event_minus", np.int8),      # Qubit sayısı bir azalan seviye değeri (0: yok)
+)
+
+
+def _bottleneck_rows(usage, capacities):
+    """
+    Kullanımı herhangi bir seviyede kapasitenin %90'ını aşan zaman noktalarını bulur
+    
+    Son zaman noktası, ardından gelen bir nokta olmadığı için değerlendirilmez.
+    
+    Args:
+        usage: (zaman noktası, seviye) boyutlu kullanım dizisi
+        capacities: Seviye başına kapasite
+        
+    Returns:
+        np.ndarray: Darboğaz başlangıcı olan zaman noktası indeksleri
+    """
+    n = usage.shape[0] - 1
+    rows = np.empty(max(n, 0), dtype=np.int64)
+    count = 0
+    for i in range(n):
+        for k in range(usage.shape[1]):
+            if usage[i, k] > 0.9 * capacities[k]:
+                rows[count] = i
+                count += 1
+                break
+    return rows[:count]
+
+
+def _bottleneck_rows_numpy(usage, capacities):
+    """Numba yokken kullanılan _bottleneck_rows NumPy eşdeğeri"""
+    return np.flatnonzero((usage[:-1] > 0.9 * capacities).any(axis=1))
+
+
+def _hotspot_runs(density, threshold):
+    """
+    Yoğunluğun eşiği aştığı ardışık pencere bölgelerini bulur
+    
+    Sona kadar süren (kapanmayan) bölge hotspot sayılmaz.
+    
+    Args:
+        density: Pencere başına operasyon yoğunluğu
+        threshold: Hotspot eşiği
+        
+    Returns:
+        tuple: (başlangıç indeksleri, bitiş indeksleri, bölge ortalama yoğunlukları)
+    """
+    n = density.shape[0]
+    starts = np.empty(n // 2 + 1, dtype=np.int64)
+    ends = np.empty(n // 2 + 1, dtype=np.int64)
+    means = np.empty(n // 2 + 1, dtype=np.float64)
+    count = 0
+    run_start = -1
+    total = 0.0
+    for i in range(n):
+        if density[i] > threshold:
+            if run_start < 0:
+                run_start = i
+                total = 0.0
+            total += density[i]
+        elif run_start >= 0:
+            starts[count] = run_start
+            ends[count] = i
+            means[count] = total / (i - run_start)
+            count += 1
+            run_start = -1
+    return starts[:count], ends[:count], means[:count]
+
+
+def _hotspot_runs_numpy(density, threshold):
+    """Numba yokken kullanılan _hotspot_runs NumPy eşdeğeri"""
+    above = np.concatenate(([False], density > threshold))
+    
+    # Başlangıç/bitiş indeksleri sırayla değişir; kapanmayan son bölge atılır
+    edges = np.flatnonzero(above[1:] != above[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    starts = starts[:len(ends)]
+    if not len(ends):
+        return starts, ends, np.empty(0, dtype=np.float64)
+    
+    # Bölge toplamları, eşik altı aralar dahil edilmeden sırayla toplanır
+    sums = np.add.reduceat(density, np.ravel(np.column_stack((starts, ends))))[0::2]
+    return starts, ends, sums / (ends - starts)
+
+
+if HAS_NUMBA:
+    _bottleneck_rows = njit(cache=True)(_bottleneck_rows)
+    _hotspot_runs = njit(cache=True)(_hotspot_runs)
+else:
+    _bottleneck_rows = _bottleneck_rows_numpy
+    _hotspot_runs = _hotspot_runs_numpy
+
+
+def _iter_active_gates(gates, max_time):
+    """
+    [0, max_time) aralığındaki her tamsayı zaman noktasında etkin olan kapıları verir
+    
+    Bir kapı gate.time <= t <= gate.end_time olan her t noktasında etkindir. Kapılar
+    başlangıç noktalarına göre bir kez sıralanır ve bitiş noktalarına göre bir
+    min-heap'te tutulur; kapısız zaman noktaları atlanır. Aynı noktadaki kapılar
+    devredeki sıralarıyla verilir.
+    
+    Args:
+        gates: Devredeki kapılar
+        max_time: Maksimum simülasyon zamanı (hariç)
+        
+    Yields:
+        tuple: (zaman noktası, kapının devre içi indeksi)
+    """
+    first_ticks = [max(0, math.ceil(gate.time)) for gate in gates]
+    last_ticks = [min(max_time - 1, math.floor(gate.end_time)) for gate in gates]
+    pending = sorted((index for index in range(len(gates)) if first_ticks[index] <= last_ticks[index]),
+                     key=first_ticks.__getitem__)
+    
+    active = []    # Etkin kapıların devre içi indeksleri (sıralı)
+    expiry = []    # (son zaman noktası, indeks) min-heap'i
+    position = 0
+    time_point = 0
+    while position < len(pending) or active:
+        if not active:
+            time_point = max(time_point, first_ticks[pending[position]])
+        
+        # Bu noktada başlayan kapıları etkinleştir
+        while position < len(pending) and first_ticks[pending[position]] <= time_point:
+            index = pending[position]
+            bisect.insort(active, index)
+            heapq.heappush(expiry, (last_ticks[index], index))
+            position += 1
+        
+        for index in active:
+            yield time_point, index
+        
+        # Bu noktada biten kapıları çıkar
+        while expiry and expiry[0][0] <= time_point:
+            active.remove(heapq.heappop(expiry)[1])
+        time_point += 1
+
+
 class MemoryProfile:
     """Bellek profili sınıfı, profil verilerini saklar"""
     
+    # Darboğaz analizinde kullanılan varsayılan L1/L2/L3 kapasiteleri
+    _CAP = np.array([50, 100, 200], dtype=np.float64)
+    
     def __init__(self, circuit_name=None):
         """
         MemoryProfile nesnesi oluşturur
@@ -58,33 +241,78 @@ class MemoryProfile:
         self.circuit_name = circuit_name
         self.start_time = time.time()
         self.end_time = None
-        self.events = []
         
-        # Zaman içinde bellek kullanımı
-        self.usage_timeline = defaultdict(list)  # {zaman_noktası: (L1_kullanım, L2_kullanım, L3_kullanım)}
-        
-        # Seviye başına qubit sayısı
-        self.qubit_counts = {
-            MemoryLevel.L1: 0,
-            MemoryLevel.L2: 0,
-            MemoryLevel.L3: 0
-        }
-        
-        # Qubit ömür/yaşam süreleri
-        self.qubit_lifetimes = defaultdict(lambda: {"allocated_at": None, "deallocated_at": None})
-        
-        # Darboğaz analizi için metrikler
+        # Olay kaydı: geometrik olarak büyütülen sütun dizileri
+        self._n_events = 0
+        self._event_capacity = 0
+        for name, dtype in _EVENT_COLUMNS:
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self._grow_events(_INITIAL_EVENT_CAPACITY)
+        
+        # Zaman içinde bellek kullanımı olayların seviye değişimlerinden (+1/-1)
+        # talep üzerine kümülatif toplamla oluşturulur; bu, önbelleğidir
+        self._timeline_cache = None
+        
+        # Seviye kodu başına güncel qubit sayısı (her olayda güncellenir)
+        self._level_counts = [0] * len(_LEVEL_NAMES)
+        
+        # Qubit başına son tahsis/serbest bırakma zamanları; her iki zamanı da
+        # olan qubit'lerin ömür toplamı ve sayısı olay geldikçe güncellenir
+        self._alloc_at = {}
+        self._dealloc_at = {}
+        self._lt_sum = 0.0
+        self._lt_n = 0
+        
+        # Darboğaz analizi için metrikler; özet için süreler ve (darboğaz, seviye)
+        # doluluk oranları ayrıca dizi olarak tutulur
         self.bottlenecks = []
+        self._bottleneck_durations = np.empty(0, dtype=np.float64)
+        self._bottleneck_util = np.empty((0, 3), dtype=np.float64)
         
-        # Seviyeler arası transfer sayıları
-        self.transfer_counts = defaultdict(int)  # {(source_level, target_level): count}
-        
-        # Operasyon sayaçları
-        self.operation_counts = defaultdict(int)  # {operation_type: count}
+        # Seviyeler arası transfer ve operasyon sayıları olay sütunlarından
+        # talep üzerine sayılır (transfer_counts / operation_counts)
         
         # Yoğun zamanlı bölgeler
         self.hotspots = []
     
+    def _grow_events(self, needed):
+        """
+        Olay sütunlarını en az `needed` olayı tutacak şekilde büyütür
+        
+        Args:
+            needed: Gereken minimum kapasite
+        """
+        if needed <= self._event_capacity:
+            return
+        
+        new_capacity = max(needed, self._event_capacity * 2)
+        for name, dtype in _EVENT_COLUMNS:
+            column = np.empty(new_capacity, dtype=dtype)
+            column[:self._n_events] = getattr(self, name)[:self._n_events]
+            setattr(self, name, column)
+        self._event_capacity = new_capacity
+    
+    @property
+    def events(self):
+        """Olay kayıtlarının sözlük listesi (sütunlardan talep üzerine oluşturulur)"""
+        n = self._n_events
+        return [
+            {
+                "type": ProfilingEvent(event_type),
+                "time": time_point,
+                "qubit_id": qubit_id if qubit_id >= 0 else None,
+                "memory_level": _LEVEL_NAMES[level],
+                "source_level": _LEVEL_NAMES[source_level],
+                "target_level": _LEVEL_NAMES[target_level],
+                "gate_type": _GATE_NAMES[gate_type]
+            }
+            for event_type, time_point, qubit_id, level, source_level, target_level, gate_type in zip(
+                self._event_types[:n].tolist(), self._event_times[:n].tolist(),
+                self._event_qubits[:n].tolist(), self._event_levels[:n].tolist(),
+                self._event_sources[:n].tolist(), self._event_targets[:n].tolist(),
+                self._event_gates[:n].tolist())
+        ]
+    
     def add_event(self, event_type, time_point, qubit=None, level=None, source_level=None, target_level=None, gate=None):
         """
         Profil olayı ekler
@@ -98,40 +326,150 @@ class MemoryProfile:
             target_level: Transfer olayı için hedef seviye (opsiyonel)
             gate: Uygulanan kapı (opsiyonel)
         """
-        event = {
-            "type": event_type,
-            "time": time_point,
-            "qubit_id": qubit.id if qubit else None,
-            "memory_level": level.name if level else None,
-            "source_level": source_level.name if source_level else None,
-            "target_level": target_level.name if target_level else None,
-            "gate_type": gate.type.name if gate else None
+        n = self._n_events
+        if n == self._event_capacity:
+            self._grow_events(n + 1)
+        level_codes = _LEVEL_CODES
+        source_code = level_codes[source_level]
+        target_code = level_codes[target_level]
+        self._event_types[n] = _EVENT_CODES[event_type]
+        self._event_times[n] = time_point
+        self._event_qubits[n] = qubit.id if qubit else -1
+        self._event_levels[n] = level_codes[level]
+        self._event_sources[n] = source_code
+        self._event_targets[n] = target_code
+        self._event_gates[n] = _GATE_CODES[gate.type] if gate else 0
+        self._n_events = n + 1
+        
+        # Olay tipine göre ek işlemler; seviye başına qubit sayılarının
+        # değişimi yalnızca (artan, azalan) seviye olarak kaydedilir
+        plus = minus = 0
+        if event_type is ProfilingEvent.ALLOCATE:
+            plus = level_codes[qubit.memory_level]
+            self._record_lifetime(qubit.id, time_point, None)
+            
+        elif event_type is ProfilingEvent.DEALLOCATE:
+            minus = level_codes[qubit.memory_level]
+            self._record_lifetime(qubit.id, None, time_point)
+            
+        elif event_type is ProfilingEvent.TRANSFER:
+            minus = source_code
+            plus = target_code
+        
+        self._event_plus[n] = plus
+        self._event_minus[n] = minus
+        self._level_counts[plus] += 1
+        self._level_counts[minus] -= 1
+        self._timeline_cache = None
+    
+    def _record_lifetime(self, qubit_id, allocated_at, deallocated_at):
+        """
+        Qubit'in tahsis veya serbest bırakma zamanını günceller
+        
+        Qubit'in önceki ömür katkısı (varsa) toplamdan çıkarılır ve güncel
+        zamanlarla yeniden eklenir.
+        
+        Args:
+            qubit_id: Qubit kimliği
+            allocated_at: Yeni tahsis zamanı (None: değişmedi)
+            deallocated_at: Yeni serbest bırakma zamanı (None: değişmedi)
+        """
+        old_allocated = self._alloc_at.get(qubit_id)
+        old_deallocated = self._dealloc_at.get(qubit_id)
+        if old_allocated is not None and old_deallocated is not None:
+            self._lt_sum -= old_deallocated - old_allocated
+            self._lt_n -= 1
+        
+        if allocated_at is None:
+            allocated_at = old_allocated
+        else:
+            self._alloc_at[qubit_id] = allocated_at
+        if deallocated_at is None:
+            deallocated_at = old_deallocated
+        else:
+            self._dealloc_at[qubit_id] = deallocated_at
+        
+        if allocated_at is not None and deallocated_at is not None:
+            self._lt_sum += deallocated_at - allocated_at
+            self._lt_n += 1
+    
+    @property
+    def qubit_lifetimes(self):
+        """Qubit kimliği başına tahsis/serbest bırakma zamanları"""
+        return {
+            qubit_id: {"allocated_at": self._alloc_at.get(qubit_id),
+                       "deallocated_at": self._dealloc_at.get(qubit_id)}
+            for qubit_id in {**self._alloc_at, **self._dealloc_at}
         }
-        self.events.append(event)
+    
+    @property
+    def operation_counts(self):
+        """Olay tipi başına olay sayıları ({ProfilingEvent: sayı}, ilk görülme sırasıyla)"""
+        types = self._event_types[:self._n_events]
+        codes, first, counts = np.unique(types, return_index=True, return_counts=True)
+        order = np.argsort(first)
+        return defaultdict(int, zip([_EVENTS[code] for code in codes[order].tolist()],
+                                    counts[order].tolist()))
+    
+    @property
+    def transfer_counts(self):
+        """Seviyeler arası transfer sayıları ({(kaynak, hedef): sayı}, ilk görülme sırasıyla)"""
+        n = self._n_events
+        is_transfer = self._event_types[:n] == ProfilingEvent.TRANSFER.value
+        pairs = (self._event_sources[:n][is_transfer].astype(np.int64) * len(_LEVEL_NAMES)
+                 + self._event_targets[:n][is_transfer])
+        codes, first, counts = np.unique(pairs, return_index=True, return_counts=True)
+        order = np.argsort(first)
+        return defaultdict(int, zip(
+            [(_LEVEL_NAMES[code // len(_LEVEL_NAMES)], _LEVEL_NAMES[code % len(_LEVEL_NAMES)])
+             for code in codes[order].tolist()],
+            counts[order].tolist()))
+    
+    def _timeline(self):
+        """
+        Olay kaydından zaman sıralı bellek kullanımını oluşturur (önbellekli)
         
-        # Olay tipine göre sayaçları güncelle
-        self.operation_counts[event_type] += 1
+        Her olaydan sonraki L1/L2/L3 qubit sayıları, seviye değişimlerinin
+        kümülatif toplamıdır. Kayıtlar zamana göre kararlı biçimde sıralanır,
+        böylece aynı zamanlı olaylar eklenme sırasını korur.
         
-        # Olay tipine göre ek işlemler
-        if event_type == ProfilingEvent.ALLOCATE:
-            self.qubit_counts[qubit.memory_level] += 1
-            self.qubit_lifetimes[qubit.id]["allocated_at"] = time_point
+        Returns:
+            tuple: ((kayıt, 3) kullanım dizisi, tekil zaman noktaları,
+                    her zaman noktasındaki son kullanım, her zaman noktasına
+                    kadarki (dahil) toplam olay sayısı)
+        """
+        if self._timeline_cache is None:
+            n = self._n_events
+            rows = np.arange(n)
+            deltas = np.zeros((n, len(_LEVEL_NAMES)), dtype=np.int64)
+            deltas[rows, self._event_plus[:n]] += 1
+            deltas[rows, self._event_minus[:n]] -= 1
             
-        elif event_type == ProfilingEvent.DEALLOCATE:
-            self.qubit_counts[qubit.memory_level] -= 1
-            self.qubit_lifetimes[qubit.id]["deallocated_at"] = time_point
+            times = self._event_times[:n].copy()
+            usage = np.cumsum(deltas[:, 1:], axis=0)
             
-        elif event_type == ProfilingEvent.TRANSFER:
-            self.qubit_counts[source_level] -= 1
-            self.qubit_counts[target_level] += 1
-            self.transfer_counts[(source_level.name, target_level.name)] += 1
+            # Olaylar genellikle zaman sırasıyla gelir; yalnızca sıra bozulduysa sırala
+            if (times[1:] < times[:-1]).any():
+                order = np.argsort(times, kind='stable')
+                times = times[order]
+                usage = usage[order]
             
-        # Zaman çizelgesini güncelle
-        self.usage_timeline[time_point].append((
-            self.qubit_counts[MemoryLevel.L1],
-            self.qubit_counts[MemoryLevel.L2],
-            self.qubit_counts[MemoryLevel.L3]
-        ))
+            # Her zaman noktasının son kaydı
+            last = np.flatnonzero(np.append(times[1:] != times[:-1], True))[:n]
+            self._timeline_cache = (usage, times[last], usage[last], last + 1)
+        return self._timeline_cache
+    
+    @property
+    def qubit_counts(self):
+        """Seviye başına şu anki qubit sayısı (olaylarla güncellenen sayaçlardan)"""
+        counts = self._level_counts
+        return {level: counts[_LEVEL_CODES[level]] for level in MemoryLevel}
+    
+    @property
+    def usage_timeline(self):
+        """Zaman noktası başına son olaydan sonraki (L1, L2, L3) kullanımı"""
+        _, point_times, point_usage, _ = self._timeline()
+        return dict(zip(point_times.tolist(), map(tuple, point_usage.tolist())))
     
     def finalize(self):
         """Profili sonlandırır ve son analizleri yapar"""
@@ -145,77 +483,68 @@ class MemoryProfile:
     
     def _analyze_bottlenecks(self):
         """Bellek kullanımındaki darboğazları analiz eder"""
-        # Zaman noktalarını sırala
-        time_points = sorted(self.usage_timeline.keys())
+        # Sıralı zaman noktaları ve her noktadaki son durum
+        _, point_times, point_usage, _ = self._timeline()
         
-        if not time_points:
+        if not len(point_times):
             return
         
-        # Ardışık zaman noktaları arasında darboğazları belirle
-        for i in range(len(time_points) - 1):
-            t1, t2 = time_points[i], time_points[i+1]
-            usage1 = self.usage_timeline[t1][-1]  # Son durum
-            usage2 = self.usage_timeline[t2][-1]  # Son durum
-            
-            # Eğer herhangi bir bellek seviyesi %90'ın üzerinde doluysa, darboğaz olarak işaretle
-            l1_capacity = 50  # Varsayılan değerler, gerçek kapasiteler hesaplanabilir
-            l2_capacity = 100
-            l3_capacity = 200
-            
-            if (usage1[0] > 0.9 * l1_capacity or 
-                usage1[1] > 0.9 * l2_capacity or 
-                usage1[2] > 0.9 * l3_capacity):
-                self.bottlenecks.append({
-                    "start_time": t1,
-                    "end_time": t2,
-                    "L1_usage": usage1[0],
-                    "L2_usage": usage1[1],
-                    "L3_usage": usage1[2],
-                    "L1_utilization": usage1[0] / l1_capacity,
-                    "L2_utilization": usage1[1] / l2_capacity,
-                    "L3_utilization": usage1[2] / l3_capacity
-                })
+        # Eğer herhangi bir bellek seviyesi %90'ın üzerinde doluysa, ardışık iki
+        # zaman noktası arasını darboğaz olarak işaretle
+        rows = _bottleneck_rows(point_usage, self._CAP)
+        if not len(rows):
+            return
+        
+        # Yalnızca darboğaz satırları için kayıt sütunlarını toplu oluştur
+        usage = point_usage[rows]
+        util = usage / self._CAP
+        start_times = point_times[rows]
+        end_times = point_times[rows + 1]
+        self._bottleneck_durations = np.concatenate([self._bottleneck_durations, end_times - start_times])
+        self._bottleneck_util = np.concatenate([self._bottleneck_util, util])
+        
+        records = zip(start_times.tolist(), end_times.tolist(), usage.tolist(), util.tolist())
+        for start_time, end_time, (l1_usage, l2_usage, l3_usage), (l1_util, l2_util, l3_util) in records:
+            self.bottlenecks.append({
+                "start_time": start_time,
+                "end_time": end_time,
+                "L1_usage": l1_usage,
+                "L2_usage": l2_usage,
+                "L3_usage": l3_usage,
+                "L1_utilization": l1_util,
+                "L2_utilization": l2_util,
+                "L3_utilization": l3_util
+            })
     
     def _identify_hotspots(self):
         """Yüksek yoğunluklu operasyon bölgelerini (hotspots) belirler"""
-        # Zaman noktalarını sırala
-        time_points = sorted(self.usage_timeline.keys())
+        # Sıralı zaman noktaları ve her noktaya kadarki kümülatif olay sayısı
+        _, point_times, _, point_ends = self._timeline()
+        time_points = point_times.tolist()
         
         if not time_points:
             return
         
-        # Operasyon yoğunluğunu hesapla
-        op_density = {}
+        # Operasyon yoğunluğunu hesapla: i. pencere [t_i, t_(i+w-1)] aralığındaki olay
+        # sayısı, pencerenin son ve ilk noktasından önceki kümülatif sayıların farkıdır
         window_size = max(5, len(time_points) // 20)  # 5 veya toplam noktaların %5'i
+        window_count = len(time_points) - window_size
+        if window_count <= 0:
+            return
         
-        for i in range(len(time_points) - window_size):
-            window_end = min(i + window_size, len(time_points))
-            window_events = sum(1 for event in self.events 
-                              if time_points[i] <= event["time"] <= time_points[window_end-1])
-            
-            op_density[time_points[i]] = window_events / window_size
-        
-        # Ortalama ve standart sapma hesapla
-        if op_density:
-            mean_density = np.mean(list(op_density.values()))
-            std_density = np.std(list(op_density.values()))
-            
-            # Ortalamadan 2 standart sapma üzerindeki bölgeleri hotspot olarak işaretle
-            threshold = mean_density + 2 * std_density
-            
-            hotspot_start = None
-            for t in sorted(op_density.keys()):
-                if op_density[t] > threshold:
-                    if hotspot_start is None:
-                        hotspot_start = t
-                elif hotspot_start is not None:
-                    self.hotspots.append({
-                        "start_time": hotspot_start,
-                        "end_time": t,
-                        "density": np.mean([op_density[x] for x in op_density 
-                                          if hotspot_start <= x < t])
-                    })
-                    hotspot_start = None
+        window_starts = np.concatenate(([0], point_ends[:window_count - 1]))
+        window_ends = point_ends[window_size - 1:window_size - 1 + window_count]
+        op_density = (window_ends - window_starts) / window_size
+        
+        # Ortalamadan 2 standart sapma üzerindeki bölgeleri hotspot olarak işaretle
+        threshold = np.mean(op_density) + 2 * np.std(op_density)
+        starts, ends, densities = _hotspot_runs(op_density, threshold)
+        for run_start, run_end, density in zip(starts.tolist(), ends.tolist(), densities.tolist()):
+            self.hotspots.append({
+                "start_time": time_points[run_start],
+                "end_time": time_points[run_end],
+                "density": density
+            })
     
     def get_average_qubit_lifetime(self):
         """
@@ -224,16 +553,10 @@ class MemoryProfile:
         Returns:
             float: Ortalama qubit ömrü
         """
-        lifetimes = []
-        for qubit_id, data in self.qubit_lifetimes.items():
-            if data["allocated_at"] is not None and data["deallocated_at"] is not None:
-                lifetime = data["deallocated_at"] - data["allocated_at"]
-                lifetimes.append(lifetime)
-        
-        if not lifetimes:
+        if not self._lt_n:
             return 0
         
-        return np.mean(lifetimes)
+        return self._lt_sum / self._lt_n
     
     def get_memory_usage_stats(self):
         """
@@ -242,10 +565,9 @@ class MemoryProfile:
         Returns:
             dict: Bellek kullanım istatistikleri
         """
-        # Zaman noktalarını sırala
-        time_points = sorted(self.usage_timeline.keys())
+        usage = self._timeline()[0]
         
-        if not time_points:
+        if not len(usage):
             return {
                 "L1_avg": 0,
                 "L2_avg": 0,
@@ -258,10 +580,9 @@ class MemoryProfile:
                 "L3_utilization": 0
             }
         
-        # Her seviye için kullanım istatistiklerini hesapla
-        l1_usage = [usage[0] for t in time_points for usage in self.usage_timeline[t]]
-        l2_usage = [usage[1] for t in time_points for usage in self.usage_timeline[t]]
-        l3_usage = [usage[2] for t in time_points for usage in self.usage_timeline[t]]
+        # Her seviye için kullanım istatistiklerini tek (T, 3) dizi üzerinde hesapla
+        avg_usage = usage.mean(axis=0)
+        max_usage = usage.max(axis=0)
         
         # Varsayılan kapasiteler
         l1_capacity = 50
@@ -269,15 +590,15 @@ class MemoryProfile:
         l3_capacity = 200
         
         return {
-            "L1_avg": np.mean(l1_usage) if l1_usage else 0,
-            "L2_avg": np.mean(l2_usage) if l2_usage else 0,
-            "L3_avg": np.mean(l3_usage) if l3_usage else 0,
-            "L1_max": np.max(l1_usage) if l1_usage else 0,
-            "L2_max": np.max(l2_usage) if l2_usage else 0,
-            "L3_max": np.max(l3_usage) if l3_usage else 0,
-            "L1_utilization": np.mean(l1_usage) / l1_capacity if l1_usage else 0,
-            "L2_utilization": np.mean(l2_usage) / l2_capacity if l2_usage else 0,
-            "L3_utilization": np.mean(l3_usage) / l3_capacity if l3_usage else 0
+            "L1_avg": avg_usage[0],
+            "L2_avg": avg_usage[1],
+            "L3_avg": avg_usage[2],
+            "L1_max": max_usage[0],
+            "L2_max": max_usage[1],
+            "L3_max": max_usage[2],
+            "L1_utilization": avg_usage[0] / l1_capacity,
+            "L2_utilization": avg_usage[1] / l2_capacity,
+            "L3_utilization": avg_usage[2] / l3_capacity
         }
     
     def get_bottleneck_summary(self):
@@ -287,7 +608,8 @@ class MemoryProfile:
         Returns:
             dict: Darboğaz özeti
         """
-        if not self.bottlenecks:
+        durations = self._bottleneck_durations
+        if not len(durations):
             return {
                 "count": 0,
                 "avg_duration": 0,
@@ -296,24 +618,15 @@ class MemoryProfile:
                 "most_constrained_level": None
             }
         
-        durations = [b["end_time"] - b["start_time"] for b in self.bottlenecks]
-        
-        # En çok kısıtlı olan bellek seviyesini belirle
-        l1_bottlenecks = sum(1 for b in self.bottlenecks if b["L1_utilization"] > 0.9)
-        l2_bottlenecks = sum(1 for b in self.bottlenecks if b["L2_utilization"] > 0.9)
-        l3_bottlenecks = sum(1 for b in self.bottlenecks if b["L3_utilization"] > 0.9)
-        
-        most_constrained = "L1"
-        if l2_bottlenecks > l1_bottlenecks:
-            most_constrained = "L2"
-        if l3_bottlenecks > max(l1_bottlenecks, l2_bottlenecks):
-            most_constrained = "L3"
+        # En çok kısıtlı olan bellek seviyesini belirle (eşitlikte alt seviye)
+        level_counts = (self._bottleneck_util > 0.9).sum(axis=0)
+        most_constrained = _LEVEL_NAMES[int(level_counts.argmax()) + 1]
         
         return {
-            "count": len(self.bottlenecks),
-            "avg_duration": np.mean(durations) if durations else 0,
-            "max_duration": np.max(durations) if durations else 0,
-            "total_duration": np.sum(durations) if durations else 0,
+            "count": len(durations),
+            "avg_duration": durations.mean(),
+            "max_duration": durations.max(),
+            "total_duration": durations.sum(),
             "most_constrained_level": most_constrained
         }
     
@@ -328,6 +641,9 @@ class MemoryProfile:
         Returns:
             matplotlib.figure.Figure: Oluşturulan grafik figürü
         """
+        # matplotlib yalnızca görselleştirmede gerekir, bu yüzden burada yüklenir
+        import matplotlib.pyplot as plt
+        
         try:
             if circuit is not None:
                 # Yeni profil oluştur
@@ -402,6 +718,10 @@ class MemoryProfiler:
         self._active_profile = MemoryProfile(circuit_name)
         self.is_profiling = True
         
+        # Profilleme sürerken profile_event, durum denetimi yapmayan kayıt
+        # yoluna bağlanır; stop_profiling sınıf yöntemini geri getirir
+        self.profile_event = self._record_event
+        
         return self._active_profile
     
     def stop_profiling(self):
@@ -421,6 +741,7 @@ class MemoryProfiler:
         profile = self._active_profile
         self._active_profile = None
         self.is_profiling = False
+        self.__dict__.pop("profile_event", None)
         
         return profile
     
@@ -448,6 +769,13 @@ class MemoryProfiler:
                                       source_level, target_level, gate)
         return True
     
+    def _record_event(self, event_type, time_point, qubit=None, level=None, 
+                      source_level=None, target_level=None, gate=None):
+        """profile_event'in profilleme sürerken kullanılan, denetimsiz hali"""
+        self._active_profile.add_event(event_type, time_point, qubit, level, 
+                                      source_level, target_level, gate)
+        return True
+    
     def profile_circuit_execution(self, circuit=None, max_time=1000):
         """
         Bir devrenin yürütülmesini profiller
@@ -468,26 +796,22 @@ class MemoryProfiler:
         # Profilciyi başlat
         profile = self.start_profiling(circuit.name)
         
-        # Simülasyon zamanını hızlandır
-        for time_point in range(max_time):
-            # Gerçek bir simülasyonda, bu her kapının zamanında uygulama alacaktır
-            for gate in [g for g in circuit.gates if g.time <= time_point <= g.end_time]:
-                qubits = gate.qubits
-                # Kapı uygulamasını profil et
-                self.profile_event(
-                    event_type=ProfilingEvent.GATE_APPLY,
-                    time_point=time_point,
-                    qubit=qubits[0] if qubits else None,
-                    gate=gate
-                )
-                
-                # Ölçüm işlemlerini profil et
-                if gate.type.name == "MEASURE":
-                    self.profile_event(
-                        event_type=ProfilingEvent.MEASUREMENT,
-                        time_point=time_point,
-                        qubit=qubits[0] if qubits else None
-                    )
+        # Kapı başına değişmeyen bilgiler (ilk qubit, ölçüm mü) zaman noktası
+        # döngüsünden önce bir kez çözülür
+        gates = circuit.gates
+        first_qubits = [gate.qubits[0] if gate.qubits else None for gate in gates]
+        is_measure = [gate.type is GateType.MEASURE for gate in gates]
+        add_event = profile.add_event
+        
+        # Simülasyon zamanını hızlandır: yalnızca en az bir kapının etkin olduğu
+        # zaman noktaları ziyaret edilir
+        for time_point, index in _iter_active_gates(gates, max_time):
+            # Kapı uygulamasını profil et
+            add_event(ProfilingEvent.GATE_APPLY, time_point, first_qubits[index], gate=gates[index])
+            
+            # Ölçüm işlemlerini profil et
+            if is_measure[index]:
+                add_event(ProfilingEvent.MEASUREMENT, time_point, first_qubits[index])
         
         # Profilciyi durdur
         self.stop_profiling()
@@ -26,13 +26,24 @@ Qubit Geri Dönüşüm modülü
 Qubit'lerin sıfırlanması ve yeniden kullanımı ile ilgili stratejileri içerir.
 """
 
+import bisect
 import logging
 from enum import Enum, auto
+from operator import attrgetter
 import numpy as np
 
 from ..core.gate import GateType
 
 
+# Kapıları başlangıç ve bitiş zamanına göre sıralamak için anahtarlar
+_gate_time = attrgetter("time")
+_gate_end = attrgetter("end_time")
+
+# Dolanıklık oluşturmayan ve dolanıklığı bozan kapı türleri
+_NON_ENTANGLING = frozenset((GateType.MEASURE, GateType.RESET, GateType.BARRIER))
+_MEAS_RESET = frozenset((GateType.MEASURE, GateType.RESET))
+
+
 class RecyclingStrategy(Enum):
     """Qubit geri dönüşüm stratejileri"""
     NONE = auto()           # Geri dönüşüm yok
@@ -43,6 +54,52 @@ class RecyclingStrategy(Enum):
     PREDICTIVE = auto()     # Çalışma zamanı tahminlerine dayalı geri dönüşüm
 
 
+class _GateIndex:
+    """optimize() süresince bir devrenin kapılarına ait önbellek"""
+    
+    __slots__ = ("circuit", "gate_count", "by_qubit", "sorted_views", "depth",
+                 "start_times", "gates_by_time", "usage_analysis", "usage_gate_count")
+    
+    def __init__(self, circuit):
+        """
+        Devredeki kapıları tek geçişte qubit'lere göre gruplar
+        
+        Args:
+            circuit: İndekslenecek devre
+        """
+        self.circuit = circuit
+        self.gate_count = len(circuit.gates)
+        
+        # {qubit: [kapılar]}; kapılar devredeki ekleme sırasındadır
+        self.by_qubit = {qubit: [] for qubit in circuit.qubits}
+        
+        # {qubit: sıralı görünümler}, talep üzerine doldurulur
+        self.sorted_views = {}
+        
+        # Devre derinliği (calculate_depth ile aynı) ve zamana göre kararlı
+        # sıralı kapılar (talep üzerine)
+        self.depth = 0
+        self.start_times = None
+        self.gates_by_time = None
+        
+        # Bu devre için yapılan son kullanım analizi ve o andaki kapı sayısı
+        self.usage_analysis = None
+        self.usage_gate_count = 0
+        
+        depth = None
+        for gate in circuit.gates:
+            end_time = gate.end_time
+            if depth is None or end_time > depth:
+                depth = end_time
+            for qubit in gate.qubits:
+                qubit_gates = self.by_qubit.setdefault(qubit, [])
+                # Aynı qubit'i birden fazla kez içeren kapı bir kez sayılır
+                if not qubit_gates or qubit_gates[-1] is not gate:
+                    qubit_gates.append(gate)
+        if depth is not None:
+            self.depth = depth
+
+
 class QubitRecycler:
     """
     Qubit geri dönüşümünü yöneten sınıf
@@ -70,6 +127,9 @@ class QubitRecycler:
         
         # Son yaşam süresi analizi sonuçlarını önbelleğe alma
         self._last_lifetime_analysis = None
+        
+        # optimize() süresince devrenin kapı indeksi (_GateIndex)
+        self._gate_index = None
     
     def optimize(self, circuit, qubit_usage_analysis=None):
         """
@@ -85,31 +145,205 @@ class QubitRecycler:
         if self.strategy == RecyclingStrategy.NONE:
             return circuit, 0
         
+        # Kapısız devrede hiçbir strateji değişiklik yapmaz; kopyalamaya gerek yok
+        if not circuit.gates:
+            return circuit, 0
+        
         # Devrenin kopyasını oluştur
         optimized_circuit = circuit.copy()
         
-        # Kullanım analizini yap veya verilen analizi kullan
-        usage_analysis = qubit_usage_analysis
-        if usage_analysis is None:
-            usage_analysis = self._analyze_qubit_usage(optimized_circuit)
-        
-        # Strateji seçimi
-        if self.strategy == RecyclingStrategy.RESET_BASED:
-            saved = self._apply_reset_based_recycling(optimized_circuit, usage_analysis)
-        elif self.strategy == RecyclingStrategy.TELEPORT:
-            saved = self._apply_teleport_based_recycling(optimized_circuit, usage_analysis)
-        elif self.strategy == RecyclingStrategy.ADAPTIVE:
-            saved = self._apply_adaptive_recycling(optimized_circuit, usage_analysis)
-        elif self.strategy == RecyclingStrategy.DYNAMIC:
-            saved = self._apply_dynamic_recycling(optimized_circuit, usage_analysis)
-        elif self.strategy == RecyclingStrategy.PREDICTIVE:
-            saved = self._apply_predictive_recycling(optimized_circuit, usage_analysis)
-        else:
-            saved = 0
+        # Qubit başına kapı listelerini bu çağrı için bir kez oluştur
+        self._gate_index = _GateIndex(optimized_circuit)
+        try:
+            # Kullanım analizini yap veya verilen analizi kullan
+            usage_analysis = qubit_usage_analysis
+            if usage_analysis is None:
+                usage_analysis = self._analyze_qubit_usage(optimized_circuit)
+            
+            # Strateji seçimi
+            if self.strategy == RecyclingStrategy.RESET_BASED:
+                saved = self._apply_reset_based_recycling(optimized_circuit, usage_analysis)
+            elif self.strategy == RecyclingStrategy.TELEPORT:
+                saved = self._apply_teleport_based_recycling(optimized_circuit, usage_analysis)
+            elif self.strategy == RecyclingStrategy.ADAPTIVE:
+                saved = self._apply_adaptive_recycling(optimized_circuit, usage_analysis)
+            elif self.strategy == RecyclingStrategy.DYNAMIC:
+                saved = self._apply_dynamic_recycling(optimized_circuit, usage_analysis)
+            elif self.strategy == RecyclingStrategy.PREDICTIVE:
+                saved = self._apply_predictive_recycling(optimized_circuit, usage_analysis)
+            else:
+                saved = 0
+        finally:
+            self._gate_index = None
         
         self.saved_qubits += saved
         return optimized_circuit, saved
     
+    def _index_for(self, circuit):
+        """
+        Devrenin güncel kapı indeksini döndürür
+        
+        Devreye indeks dışından kapı eklendiyse indeks yeniden oluşturulur.
+        
+        Args:
+            circuit: Devre
+            
+        Returns:
+            _GateIndex: Kapı indeksi, optimize() dışında veya başka bir devre için None
+        """
+        index = self._gate_index
+        if index is None or index.circuit is not circuit:
+            return None
+        if index.gate_count != len(circuit.gates):
+            index = self._gate_index = _GateIndex(circuit)
+        return index
+    
+    def _gates_on(self, circuit, qubit):
+        """
+        Qubit üzerindeki kapıları devredeki ekleme sırasıyla döndürür
+        
+        Args:
+            circuit: Devre
+            qubit: Kapıları istenen qubit
+            
+        Returns:
+            list: Qubit üzerindeki kapılar (değiştirilmemelidir)
+        """
+        index = self._index_for(circuit)
+        if index is None:
+            return circuit.get_gates_by_qubit(qubit)
+        return index.by_qubit.get(qubit, [])
+    
+    def _sorted_gates_on(self, circuit, qubit):
+        """
+        Qubit kapılarının başlangıç ve bitiş zamanına göre kararlı sıralı görünümleri
+        
+        Eşit zamanlı kapılar devredeki sıralarını korur; böylece ikili aramayla
+        bulunan ilk eşleşme, devre sırasında ilk gelen kapıdır.
+        
+        Args:
+            circuit: Devre
+            qubit: Kapıları istenen qubit
+            
+        Returns:
+            tuple: (başlangıç zamanları, başlangıca göre kapılar,
+                    bitiş zamanları, bitişe göre kapılar)
+        """
+        index = self._index_for(circuit)
+        views = index.sorted_views.get(qubit) if index is not None else None
+        if views is None:
+            qubit_gates = self._gates_on(circuit, qubit)
+            by_start = sorted(qubit_gates, key=_gate_time)
+            by_end = sorted(qubit_gates, key=_gate_end)
+            views = ([gate.time for gate in by_start], by_start,
+                     [gate.time + gate.duration for gate in by_end], by_end)
+            if index is not None:
+                index.sorted_views[qubit] = views
+        return views
+    
+    def _circuit_depth(self, circuit):
+        """
+        Devre derinliğini döndürür (optimize() süresince önbellekten)
+        
+        Args:
+            circuit: Devre
+            
+        Returns:
+            float: Devre derinliği
+        """
+        index = self._index_for(circuit)
+        if index is None:
+            return circuit.calculate_depth()
+        return index.depth
+    
+    def _gates_by_time(self, circuit):
+        """
+        Devredeki kapıları zamana göre kararlı sıralı döndürür (optimize() süresince önbellekten)
+        
+        Args:
+            circuit: Devre
+            
+        Returns:
+            tuple: (başlangıç zamanları, kapılar); değiştirilmemelidir
+        """
+        index = self._index_for(circuit)
+        if index is not None and index.gates_by_time is not None:
+            return index.start_times, index.gates_by_time
+        
+        gates = sorted(circuit.gates, key=_gate_time)
+        start_times = [gate.time for gate in gates]
+        if index is not None:
+            index.start_times, index.gates_by_time = start_times, gates
+        return start_times, gates
+    
+    def _add_reset(self, circuit, qubit, time):
+        """
+        Devreye reset kapısı ekler ve kapı indeksini günceller
+        
+        Args:
+            circuit: Devre
+            qubit: Sıfırlanacak qubit
+            time: Reset zamanı
+            
+        Returns:
+            Gate: Eklenen reset kapısı
+        """
+        index = self._index_for(circuit)
+        gate = circuit.add_gate(GateType.RESET, qubit, time=time)
+        if index is not None:
+            index.gate_count = len(circuit.gates)
+            index.by_qubit.setdefault(qubit, []).append(gate)
+            if gate.end_time > index.depth:
+                index.depth = gate.end_time
+            
+            # Sıralı görünümlerde yeni kapı, eşit zamanlıların sonuna girer
+            views = index.sorted_views.get(qubit)
+            if views is not None:
+                starts, by_start, ends, by_end = views
+                position = bisect.bisect_right(starts, gate.time)
+                starts.insert(position, gate.time)
+                by_start.insert(position, gate)
+                end_time = gate.time + gate.duration
+                position = bisect.bisect_right(ends, end_time)
+                ends.insert(position, end_time)
+                by_end.insert(position, gate)
+            
+            # Zamana göre sıralı kapılar yeniden gerektiğinde oluşturulur
+            index.start_times = index.gates_by_time = None
+        return gate
+    
+    def _add_resets(self, circuit, resets):
+        """
+        Birbirinden bağımsız reset kapılarını toplu olarak ekler ve kapı
+        indeksini tek seferde günceller
+        
+        Args:
+            circuit: Devre
+            resets: Eklenecek resetler [(qubit, zaman), ...]
+            
+        Returns:
+            list: Eklenen reset kapıları
+        """
+        if not resets:
+            return []
+        
+        index = self._index_for(circuit)
+        gates = [circuit.add_gate(GateType.RESET, qubit, time=time) for qubit, time in resets]
+        if index is not None:
+            index.gate_count = len(circuit.gates)
+            by_qubit = index.by_qubit
+            sorted_views = index.sorted_views
+            for gate, (qubit, _) in zip(gates, resets):
+                by_qubit.setdefault(qubit, []).append(gate)
+                # Sıralı görünümler gerektiğinde yeniden oluşturulur
+                sorted_views.pop(qubit, None)
+            
+            depth = max(gate.end_time for gate in gates)
+            if depth > index.depth:
+                index.depth = depth
+            index.start_times = index.gates_by_time = None
+        return gates
+    
     def _analyze_qubit_usage(self, circuit):
         """
         Devredeki qubit kullanımını analiz eder
@@ -129,64 +363,83 @@ class QubitRecycler:
         """
         analysis = {}
         for qubit in circuit.qubits:
-            qubit_gates = circuit.get_gates_by_qubit(qubit)
-            
-            if not qubit_gates:
-                # Bu qubit hiç kullanılmamış
-                analysis[qubit] = {
-                    'first_use': 0,
-                    'last_use': 0,
-                    'usage_intervals': [],
-                    'gates': [],
-                    'is_entangled_at_end': False
-                }
-                continue
-            
-            # Zamanları sırala
-            gate_times = [(gate.time, gate) for gate in qubit_gates]
-            gate_times.sort(key=lambda x: x[0])  # Sort only by time value
-            
-            first_use = gate_times[0][0]
-            last_use = gate_times[-1][0] + gate_times[-1][1].duration
-            
-            # Kullanım aralıklarını belirle
-            current_interval_start = first_use
-            current_interval_end = current_interval_start
-            usage_intervals = []
+            analysis[qubit] = self._analyze_single_qubit_usage(circuit, qubit)
+        
+        index = self._index_for(circuit)
+        if index is not None:
+            index.usage_analysis = analysis
+            index.usage_gate_count = index.gate_count
+        
+        return analysis
+    
+    def _analyze_single_qubit_usage(self, circuit, qubit):
+        """
+        Tek bir qubit'in kullanım analizini yapar
+        
+        Args:
+            circuit: Analiz edilecek devre
+            qubit: Analiz edilecek qubit
             
-            for time, gate in gate_times:
-                # Eğer arada boşluk varsa, yeni aralık başlat
-                if time > current_interval_end + 10:  # 10 birim boşluk toleransı
-                    usage_intervals.append((current_interval_start, current_interval_end))
-                    current_interval_start = time
-                
-                current_interval_end = max(current_interval_end, time + gate.duration)
-            
-            # Son aralığı ekle
-            usage_intervals.append((current_interval_start, current_interval_end))
-            
-            # Son kullanımda dolanıklık durumunu belirle
-            is_entangled_at_end = False
-            for gate in reversed(qubit_gates):
-                if len(gate.qubits) > 1 and gate.type not in [GateType.MEASURE, GateType.RESET, GateType.BARRIER]:
-                    # Bu bir çok-qubitli kapı ve ölçüm/reset değil, bu nedenle dolanıklık oluşturabilir
-                    is_entangled_at_end = True
-                    break
-                
-                if gate.type == GateType.MEASURE or gate.type == GateType.RESET:
-                    # Ölçüm veya reset dolanıklığı bozar
-                    is_entangled_at_end = False
-                    break
-            
-            analysis[qubit] = {
-                'first_use': first_use,
-                'last_use': last_use,
-                'usage_intervals': usage_intervals,
-                'gates': [gate for _, gate in gate_times],
-                'is_entangled_at_end': is_entangled_at_end
+        Returns:
+            dict: Qubit'in kullanım bilgileri
+        """
+        qubit_gates = self._gates_on(circuit, qubit)
+        
+        if not qubit_gates:
+            # Bu qubit hiç kullanılmamış
+            return {
+                'first_use': 0,
+                'last_use': 0,
+                'usage_intervals': [],
+                'gates': [],
+                'is_entangled_at_end': False
             }
         
-        return analysis
+        # Zamanları sırala (kararlı; eşit zamanlı kapılar devre sırasını korur)
+        sorted_gates = sorted(qubit_gates, key=_gate_time)
+        
+        first_use = sorted_gates[0].time
+        last_use = sorted_gates[-1].time + sorted_gates[-1].duration
+        
+        # Kullanım aralıklarını belirle
+        current_interval_start = first_use
+        current_interval_end = current_interval_start
+        usage_intervals = []
+        
+        for gate in sorted_gates:
+            time = gate.time
+            # Eğer arada boşluk varsa, yeni aralık başlat
+            if time > current_interval_end + 10:  # 10 birim boşluk toleransı
+                usage_intervals.append((current_interval_start, current_interval_end))
+                current_interval_start = time
+        
+            gate_end = time + gate.duration
+            if gate_end > current_interval_end:
+                current_interval_end = gate_end
+        
+        # Son aralığı ekle
+        usage_intervals.append((current_interval_start, current_interval_end))
+        
+        # Son kullanımda dolanıklık durumunu belirle
+        is_entangled_at_end = False
+        for gate in reversed(qubit_gates):
+            if len(gate.qubits) > 1 and gate.type not in _NON_ENTANGLING:
+                # Bu bir çok-qubitli kapı ve ölçüm/reset değil, bu nedenle dolanıklık oluşturabilir
+                is_entangled_at_end = True
+                break
+        
+            if gate.type in _MEAS_RESET:
+                # Ölçüm veya reset dolanıklığı bozar
+                is_entangled_at_end = False
+                break
+        
+        return {
+            'first_use': first_use,
+            'last_use': last_use,
+            'usage_intervals': usage_intervals,
+            'gates': sorted_gates,
+            'is_entangled_at_end': is_entangled_at_end
+        }
     
     def _analyze_qubit_lifetime(self, circuit, usage_analysis=None):
         """
@@ -236,19 +489,18 @@ class QubitRecycler:
             # Calculate total lifetime (from first to last use)
             total_lifetime = analysis['last_use'] - analysis['first_use']
             
-            # Calculate active time (sum of active periods)
-            active_time = sum(end - start for start, end in active_periods)
-            
-            # Calculate idle periods (gaps between active periods)
+            # Calculate active time (sum of active periods), idle periods (gaps
+            # between active periods) and total idle time in a single pass
+            active_time = 0
+            idle_time = 0
             idle_periods = []
-            for i in range(len(active_periods) - 1):
-                curr_end = active_periods[i][1]
-                next_start = active_periods[i + 1][0]
-                if next_start > curr_end:
-                    idle_periods.append((curr_end, next_start))
-            
-            # Calculate total idle time
-            idle_time = sum(end - start for start, end in idle_periods)
+            previous_end = None
+            for start, end in active_periods:
+                active_time += end - start
+                if previous_end is not None and start > previous_end:
+                    idle_periods.append((previous_end, start))
+                    idle_time += start - previous_end
+                previous_end = end
             
             # Calculate utilization (active time / total lifetime)
             utilization = active_time / total_lifetime if total_lifetime > 0 else 0
@@ -298,7 +550,7 @@ class QubitRecycler:
         
         reset_count = 0
         saved_qubits = 0
-        circuit_depth = circuit.calculate_depth()
+        circuit_depth = self._circuit_depth(circuit)
         
         # Identify qubits with long idle periods
         candidates = []
@@ -308,46 +560,40 @@ class QubitRecycler:
                 continue
                 
             # Consider qubits with long idle periods and low utilization
+            idle_weight = 1 - analysis['utilization']
             for idle_start, idle_end in analysis['idle_periods']:
                 idle_duration = idle_end - idle_start
                 # If idle period is significant and qubit isn't entangled at that point
                 if idle_duration > 20 and not self._is_qubit_entangled_at(circuit, qubit, idle_start):
-                    priority = idle_duration * (1 - analysis['utilization'])
-                    candidates.append((qubit, idle_start, idle_end, priority))
+                    candidates.append((qubit, idle_start, idle_end, idle_duration * idle_weight))
         
         # Sort candidates by priority (higher priority first)
         candidates.sort(key=lambda x: x[3], reverse=True)
         
         # Apply resets to selected candidates
         for qubit, idle_start, idle_end, _ in candidates:
-            # Find all gates on this qubit
-            qubit_gates = circuit.get_gates_by_qubit(qubit)
+            # Gates on this qubit, sorted by start and by end time
+            starts, by_start, ends, by_end = self._sorted_gates_on(circuit, qubit)
             
-            # Find the last gate before the idle period
-            last_gate_before = max(
-                (g for g in qubit_gates if g.time + g.duration <= idle_start), 
-                key=lambda g: g.time + g.duration, 
-                default=None
-            )
+            # Find the last gate before the idle period (earliest in circuit order on ties)
+            position = bisect.bisect_right(ends, idle_start)
+            last_gate_before = by_end[bisect.bisect_left(ends, ends[position - 1])] if position else None
             
             # Find the first gate after the idle period
-            first_gate_after = min(
-                (g for g in qubit_gates if g.time >= idle_end),
-                key=lambda g: g.time,
-                default=None
-            )
+            position = bisect.bisect_left(starts, idle_end)
+            first_gate_after = by_start[position] if position < len(starts) else None
             
             # Skip if we couldn't find the appropriate gates
             if not last_gate_before or not first_gate_after:
                 continue
                 
             # Skip if the last gate is already a reset or measure
-            if last_gate_before.type in [GateType.RESET, GateType.MEASURE]:
+            if last_gate_before.type in _MEAS_RESET:
                 continue
                 
             # Add reset after the last gate
             reset_time = last_gate_before.time + last_gate_before.duration + 1
-            circuit.add_gate(GateType.RESET, qubit, time=reset_time)
+            self._add_reset(circuit, qubit, reset_time)
             reset_count += 1
             
             # If we can reuse this qubit during the idle period, count it as saved
@@ -371,17 +617,17 @@ class QubitRecycler:
         Returns:
             bool: True if the qubit is likely entangled, False otherwise
         """
-        # Get all gates on this qubit before the time point
-        qubit_gates = [g for g in circuit.get_gates_by_qubit(qubit) if g.time < time_point]
+        # Find the last gate applied before the time point (earliest in circuit order on ties)
+        starts, by_start, _, _ = self._sorted_gates_on(circuit, qubit)
+        position = bisect.bisect_left(starts, time_point)
         
-        if not qubit_gates:
+        if not position:
             return False
             
-        # Start from the last gate applied before the time point
-        last_gate = max(qubit_gates, key=lambda g: g.time)
+        last_gate = by_start[bisect.bisect_left(starts, starts[position - 1])]
         
         # If the last gate is a measure or reset, the qubit is not entangled
-        if last_gate.type in [GateType.MEASURE, GateType.RESET]:
+        if last_gate.type in _MEAS_RESET:
             return False
             
         # If the last gate is a multi-qubit gate, the qubit might be entangled
@@ -391,10 +637,9 @@ class QubitRecycler:
                 if other_qubit == qubit:
                     continue
                     
-                other_gates = circuit.get_gates_by_qubit(other_qubit)
-                later_gates = [g for g in other_gates if g.time > last_gate.time]
-                
-                if later_gates:
+                # The other qubit is used later if its latest gate starts after this one
+                other_starts = self._sorted_gates_on(circuit, other_qubit)[0]
+                if other_starts and other_starts[-1] > last_gate.time:
                     return True
                     
         # For simplicity, if we've reached this point, assume the qubit is not entangled
@@ -417,22 +662,25 @@ class QubitRecycler:
         if end_time - start_time < 10:
             return False
             
-        # Count the number of qubits that are active during this period
+        # If a significant number of qubits are active, there's potential for reuse
+        # (this is a heuristic and could be adjusted)
+        threshold = len(circuit.qubits) / 4
+        
+        # Count the qubits that are active during this period: a qubit is active if
+        # its first gate starting at or after start_time starts by end_time
         active_qubits = 0
         for other_qubit in circuit.qubits:
             if other_qubit == qubit:
                 continue
                 
-            # Get gates for this qubit within the time period
-            time_range_gates = [g for g in circuit.get_gates_by_qubit(other_qubit)
-                             if g.time >= start_time and g.time <= end_time]
-                             
-            if time_range_gates:
+            starts = self._sorted_gates_on(circuit, other_qubit)[0]
+            position = bisect.bisect_left(starts, start_time)
+            if position < len(starts) and starts[position] <= end_time:
                 active_qubits += 1
+                if active_qubits > threshold:
+                    return True
                 
-        # If a significant number of qubits are active, there's potential for reuse
-        # (this is a heuristic and could be adjusted)
-        return active_qubits > len(circuit.qubits) / 4
+        return False
     
     def _apply_predictive_recycling(self, circuit, usage_analysis):
         """
@@ -452,8 +700,8 @@ class QubitRecycler:
         self.logger.info("Applying predictive recycling strategy")
         
         # First, analyze overall circuit structure
-        circuit_depth = circuit.calculate_depth()
-        all_gates = sorted(circuit.gates, key=lambda g: g.time)
+        circuit_depth = self._circuit_depth(circuit)
+        all_gates = self._gates_by_time(circuit)[1]
         
         # Identify execution phases (initialization, computation, measurement)
         phase_boundaries = self._identify_circuit_phases(circuit, all_gates)
@@ -464,31 +712,44 @@ class QubitRecycler:
         reset_count = 0
         saved_qubits = 0
         
+        # A qubit is used up to a phase end if its earliest gate starts by then, and
+        # from a phase start on if its latest gate starts at or after it
+        usage_spans = {}
+        for qubit, analysis in usage_analysis.items():
+            gate_times = [gate.time for gate in analysis['gates']]
+            if gate_times:
+                usage_spans[qubit] = (min(gate_times), max(gate_times))
+        
         # For each phase transition, identify qubits that won't be used in the next phase
         for i in range(len(phase_boundaries) - 1):
             current_phase_end = phase_boundaries[i]
             next_phase_start = phase_boundaries[i+1]
             
+            # Resets of one transition touch distinct qubits, so they are added
+            # together once the transition has been scanned
+            pending_resets = []
+            
             # Find qubits that are not used in the next phase
             for qubit in circuit.qubits:
-                # Skip if qubit is not in the usage analysis
-                if qubit not in usage_analysis:
+                # Skip if qubit is not in the usage analysis or has no gates
+                if qubit not in usage_spans:
                     continue
                     
                 # Check if the qubit is used in the current phase but not in the next
-                current_phase_usage = any(gate.time <= current_phase_end for gate in usage_analysis[qubit]['gates'])
-                next_phase_usage = any(gate.time >= next_phase_start for gate in usage_analysis[qubit]['gates'])
+                first_time, last_time = usage_spans[qubit]
+                current_phase_usage = first_time <= current_phase_end
+                next_phase_usage = last_time >= next_phase_start
                 
                 if current_phase_usage and not next_phase_usage and not usage_analysis[qubit]['is_entangled_at_end']:
                     # This qubit can be reset at the phase transition
                     reset_time = current_phase_end + 1
                     
                     # Check if the qubit doesn't already have a reset or measurement
-                    existing_ops = [g for g in circuit.get_gates_by_qubit(qubit) 
+                    existing_ops = [g for g in self._gates_on(circuit, qubit) 
                                   if g.time >= current_phase_end - 5 and g.time <= current_phase_end + 5]
                                   
-                    if not any(g.type in [GateType.RESET, GateType.MEASURE] for g in existing_ops):
-                        circuit.add_gate(GateType.RESET, qubit, time=reset_time)
+                    if not any(g.type in _MEAS_RESET for g in existing_ops):
+                        pending_resets.append((qubit, reset_time))
                         reset_count += 1
                         
                         # If the qubit is not used again for a significant period, count it as saved
@@ -496,6 +757,8 @@ class QubitRecycler:
                                  for gate in usage_analysis[qubit]['gates'] 
                                  if gate.time > reset_time):
                             saved_qubits += 1
+            
+            self._add_resets(circuit, pending_resets)
         
         self.logger.info(f"Added {reset_count} predictive reset operations, potentially saving {saved_qubits} qubits")
         self.total_predictive_recycles += reset_count
@@ -513,7 +776,7 @@ class QubitRecycler:
         Returns:
             list: Time points marking phase boundaries
         """
-        circuit_depth = circuit.calculate_depth()
+        circuit_depth = self._circuit_depth(circuit)
         
         # Simple phase identification based on gate density
         time_points = [g.time for g in all_gates]
@@ -524,23 +787,25 @@ class QubitRecycler:
         
         # Use a sliding window to identify changes in gate density
         window_size = max(10, len(time_points) // 20)  # 10 or 5% of all gates
-        densities = []
-        
-        for i in range(0, len(time_points) - window_size, window_size // 2):
-            window = time_points[i:i+window_size]
-            time_span = window[-1] - window[0] if len(window) > 1 else 1
-            density = len(window) / time_span
-            densities.append((window[0], density))
-        
-        # Identify significant changes in density
-        if densities:
-            avg_density = np.mean([d for _, d in densities])
-            std_density = np.std([d for _, d in densities])
+        step = window_size // 2
+        
+        # Identify significant changes in density; windows start every half
+        # window and only their first and last times matter
+        if len(time_points) > window_size:
+            time_array = np.asarray(time_points)
+            window_starts = time_array[:len(time_points) - window_size:step]
+            window_ends = time_array[window_size - 1:len(time_points) - 1:step]
+            
+            time_spans = window_ends - window_starts
+            time_spans = np.where(time_spans > 0, time_spans, 1)
+            densities = window_size / time_spans
+            
+            avg_density = densities.mean()
+            std_density = densities.std()
             threshold = avg_density + std_density
             
-            for time, density in densities:
-                if abs(density - avg_density) > threshold:
-                    phase_boundaries.append(time)
+            for window in np.flatnonzero(np.abs(densities - avg_density) > threshold):
+                phase_boundaries.append(time_points[window * step])
         
         # Add measurement phase if not already identified
         measurement_gates = [g for g in all_gates if g.type == GateType.MEASURE]
@@ -569,22 +834,22 @@ class QubitRecycler:
             list: Qubit usage analysis for each phase
         """
         phase_usage = []
+        start_times, gates = self._gates_by_time(circuit)
         
         for i in range(len(phase_boundaries) - 1):
             phase_start = phase_boundaries[i]
             phase_end = phase_boundaries[i+1]
             
-            # Count which qubits are used in this phase
-            phase_qubits = set()
-            for gate in circuit.gates:
-                if phase_start <= gate.time <= phase_end:
-                    phase_qubits.update(gate.qubits)
+            # Gates starting within [phase_start, phase_end] form a contiguous slice
+            first = bisect.bisect_left(start_times, phase_start)
+            last = bisect.bisect_right(start_times, phase_end)
             
-            # Count gate types in this phase
+            # Count which qubits are used and the gate types in this phase
+            phase_qubits = set()
             gate_types = {}
-            for gate in circuit.gates:
-                if phase_start <= gate.time <= phase_end:
-                    gate_types[gate.type] = gate_types.get(gate.type, 0) + 1
+            for gate in gates[first:last]:
+                phase_qubits.update(gate.qubits)
+                gate_types[gate.type] = gate_types.get(gate.type, 0) + 1
             
             phase_usage.append({
                 'start': phase_start,
@@ -611,7 +876,8 @@ class QubitRecycler:
         self.logger.info("Applying reset-based recycling strategy")
         reset_count = 0
         saved_qubits = 0
-        circuit_depth = circuit.calculate_depth()
+        circuit_depth = self._circuit_depth(circuit)
+        pending_resets = []
         
         # Sort qubits by last use time
         sorted_qubits = sorted(circuit.qubits, key=lambda q: usage_analysis[q]['last_use'])
@@ -623,14 +889,17 @@ class QubitRecycler:
             
             # Eğer son kullanımdan sonra devre hala devam ediyorsa ve qubit dolanık değilse
             if last_use < circuit_depth - 10 and not analysis['is_entangled_at_end']:
-                # Reset ekle
-                circuit.add_gate(GateType.RESET, qubit, time=last_use + 1)
+                # Reset ekle (kararlar devrenin kapılarına bakmadığından resetler
+                # döngü sonunda toplu eklenir)
+                pending_resets.append((qubit, last_use + 1))
                 reset_count += 1
                 
                 # Eğer bu qubit'in kullanılabilir hale gelmesi başka qubit tasarrufu sağlarsa
                 if self._can_reuse_qubit_save_allocation(circuit, qubit, last_use + 2, usage_analysis):
                     saved_qubits += 1
         
+        self._add_resets(circuit, pending_resets)
+        
         self.logger.info(f"Added {reset_count} reset operations, potentially saving {saved_qubits} qubits")
         self.total_reset_count += reset_count
         
@@ -686,8 +955,18 @@ class QubitRecycler:
         # Önce reset tabanlı stratejiyi uygula
         saved_by_reset = self._apply_reset_based_recycling(circuit, usage_analysis)
         
-        # Analizi güncelle
-        updated_analysis = self._analyze_qubit_usage(circuit)
+        # Analizi güncelle: analiz bu devre için yapıldıysa yalnızca
+        # reset eklenen qubit'ler yeniden analiz edilir
+        index = self._index_for(circuit)
+        if index is not None and usage_analysis is index.usage_analysis:
+            touched = {qubit for gate in circuit.gates[index.usage_gate_count:]
+                       for qubit in gate.qubits}
+            updated_analysis = dict(usage_analysis)
+            for qubit in circuit.qubits:
+                if qubit in touched:
+                    updated_analysis[qubit] = self._analyze_single_qubit_usage(circuit, qubit)
+        else:
+            updated_analysis = self._analyze_qubit_usage(circuit)
         
         # Sonra teleport tabanlı stratejiyi uygula
         saved_by_teleport = self._apply_teleport_based_recycling(circuit, updated_analysis)
@@ -738,16 +1017,16 @@ class QubitRecycler:
             list: Dolanık qubit çiftleri [(qubit_a, qubit_b), ...]
         """
         entangled_pairs = []
+        seen_pairs = set()
         
-        # Devredeki çok-qubitli kapıları kontrol et
-        multi_qubit_gates = [gate for gate in circuit.gates if len(gate.qubits) > 1 and 
-                            gate.type not in [GateType.MEASURE, GateType.RESET, GateType.BARRIER]]
-        
-        for gate in multi_qubit_gates:
-            if len(gate.qubits) == 2:
+        # Devredeki iki qubitli, dolanıklık oluşturabilen kapıları kontrol et
+        for gate in circuit.gates:
+            if len(gate.qubits) == 2 and gate.type not in _NON_ENTANGLING:
                 qubit_a, qubit_b = gate.qubits
-                # Eğer bu çift zaten eklenmemişse
-                if (qubit_a, qubit_b) not in entangled_pairs and (qubit_b, qubit_a) not in entangled_pairs:
+                # Eğer bu çift (herhangi bir yönde) zaten eklenmemişse
+                if (qubit_a, qubit_b) not in seen_pairs:
+                    seen_pairs.add((qubit_a, qubit_b))
+                    seen_pairs.add((qubit_b, qubit_a))
                     entangled_pairs.append((qubit_a, qubit_b))
         
         return entangled_pairs
@@ -797,18 +1076,17 @@ class QubitRecycler:
         # Not: Gerçek bir teleport protokolü çok daha karmaşıktır.
         # Bu örnek, sadece teleport işleminin simüle edildiğini göstermek içindir.
         
-        analysis_source = analysis[source_qubit]
-        analysis_target = analysis[target_qubit]
+        source_last_use = analysis[source_qubit]['last_use']
+        target_last_use = analysis[target_qubit]['last_use']
         
         # Hangi qubit önce kullanımını bitirecek?
-        if analysis_source['last_use'] < analysis_target['last_use']:
-            early_qubit = source_qubit
-            late_qubit = target_qubit
+        if source_last_use < target_last_use:
+            early_qubit, late_qubit = source_qubit, target_qubit
         else:
-            early_qubit = target_qubit
-            late_qubit = source_qubit
+            early_qubit, late_qubit = target_qubit, source_qubit
         
-        early_last_use = min(analysis_source['last_use'], analysis_target['last_use'])
+        # min() ile aynı: eşitlikte kaynak qubit'in değeri kullanılır
+        early_last_use = target_last_use if target_last_use < source_last_use else source_last_use
         
         # Yardımcı qubit gerekir
         ancilla = circuit.add_qubit(None, QubitType.ANCILLA)
@@ -26,13 +26,18 @@ Simulation paketi
 Kuantum devre simülasyonu ve hata azaltma teknikleri için modüller.
 """
 
-from .simulator import Simulator
-from .noise_model import NoiseModel
-from .error_mitigation import ErrorMitigation
-from .error_visualization import ErrorVisualization
-from .analyzer import PerformanceAnalyzer
-from .hardware import HardwareModel
-from .parallel import ParallelSimulator
+import importlib
+
+# Dışa açılan sınıflar ve tanımlandıkları modüller; modüller ilk erişimde yüklenir
+_LAZY_IMPORTS = {
+    'Simulator': '.simulator',
+    'NoiseModel': '.noise_model',
+    'ErrorMitigation': '.error_mitigation',
+    'ErrorVisualization': '.error_visualization',
+    'PerformanceAnalyzer': '.analyzer',
+    'HardwareModel': '.hardware',
+    'ParallelSimulator': '.parallel',
+}
 
 __all__ = [
     'Simulator', 
@@ -42,4 +47,28 @@ __all__ = [
     'PerformanceAnalyzer', 
     'HardwareModel',
     'ParallelSimulator'
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """
+    Paket sınıflarını ilk erişimde ilgili modülden yükler (PEP 562)
+    
+    Args:
+        name: İstenen öznitelik adı
+        
+    Returns:
+        Öznitelik değeri
+    """
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Henüz yüklenmemiş paket sınıflarını da listeler"""
+    return sorted(set(globals()) | set(__all__))
@@ -27,7 +27,102 @@ Kuantum devrelerinin performansını analiz eden sınıf.
 """
 
 import numpy as np
-from collections import defaultdict
+from collections import Counter, defaultdict
+from itertools import repeat
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _value_stats(values):
+    """
+    Değerlerin ortalamasını, maksimumunu ve minimumunu NumPy ile tek dizide hesaplar
+    
+    Args:
+        values: Sayı listesi
+        
+    Returns:
+        tuple: (ortalama, maksimum, minimum); liste boşsa (0, 0, 0).
+            Maksimum ve minimum listedeki özgün değerlerdir.
+    """
+    if not values:
+        return 0, 0, 0
+    
+    array = np.asarray(values)
+    return float(array.mean()), values[int(array.argmax())], values[int(array.argmin())]
+
+
+def _count_connectivity_violations(qubit_indices, offsets, adjacency_bits):
+    """
+    Çok qubitli kapılardaki bağlantısız qubit çiftlerini sayar
+    
+    Args:
+        qubit_indices: Kapıların qubit'lerinin donanım düğüm indeksleri, kapılar arka
+            arkaya; donanımda bağlantısı olmayan qubit'ler için -1
+        offsets: Kapı başına qubit_indices başlangıçları (son eleman toplam uzunluk)
+        adjacency_bits: Düğüm başına paketlenmiş bağlantı bitleri; j. düğüme bağlantı
+            j // 64 numaralı kelimenin j % 64 numaralı bitidir
+        
+    Returns:
+        int: Bağlantı ihlali sayısı
+    """
+    violations = 0
+    for g in range(offsets.shape[0] - 1):
+        for i in range(offsets[g], offsets[g + 1] - 1):
+            q1 = qubit_indices[i]
+            for j in range(i + 1, offsets[g + 1]):
+                q2 = qubit_indices[j]
+                if q1 < 0 or q2 < 0:
+                    violations += 1
+                elif not (adjacency_bits[q1, q2 >> 6] >> np.uint64(q2 & 63)) & np.uint64(1):
+                    violations += 1
+    return violations
+
+
+def _count_connectivity_violations_numpy(qubit_indices, offsets, adjacency_bits):
+    """Numba yokken kullanılan _count_connectivity_violations NumPy eşdeğeri"""
+    starts = offsets[:-1]
+    sizes = np.diff(offsets)
+    violations = 0
+    
+    # Aynı sayıda qubit'e sahip kapılar bir matriste birlikte değerlendirilir
+    for size in np.unique(sizes):
+        rows = qubit_indices[starts[sizes == size][:, None] + np.arange(size)]
+        for i in range(size - 1):
+            for j in range(i + 1, size):
+                q1, q2 = rows[:, i], rows[:, j]
+                known = (q1 >= 0) & (q2 >= 0)
+                q1, q2 = q1[known], q2[known]
+                words = adjacency_bits[q1, q2 >> 6]
+                connected = (words >> (q2 & 63).astype(np.uint64)) & np.uint64(1)
+                violations += len(known) - int(connected.sum())
+    return violations
+
+
+def _pack_adjacency(connected):
+    """
+    Bağlantı matrisini düğüm başına uint64 bit kümelerine paketler
+    
+    Args:
+        connected: (düğüm, düğüm) boyutlu bool bağlantı matrisi
+        
+    Returns:
+        np.ndarray: (düğüm, ceil(düğüm / 64)) boyutlu uint64 dizi
+    """
+    node_count = connected.shape[0]
+    word_count = (node_count + 63) // 64
+    packed = np.zeros((node_count, word_count * 8), dtype=np.uint8)
+    packed[:, :(node_count + 7) // 8] = np.packbits(connected, axis=1, bitorder='little')
+    return packed.view('<u8')
+
+
+if HAS_NUMBA:
+    _count_connectivity_violations = njit(cache=True)(_count_connectivity_violations)
+else:
+    _count_connectivity_violations = _count_connectivity_violations_numpy
 
 
 class PerformanceAnalyzer:
@@ -60,10 +155,13 @@ class PerformanceAnalyzer:
         metrics["circuit_depth"] = circuit.depth
         
         # Kapı istatistikleri
-        gate_counts = {}
-        for gate_type, count in circuit.gate_counts.items():
-            gate_counts[gate_type.name] = count
-        metrics["gate_counts"] = gate_counts
+        metrics["gate_counts"] = {gate_type.name: count for gate_type, count in circuit.gate_counts.items()}
+        
+        # Kapısız devrede kullanım ve uyumluluk metrikleri doğrudan sıfırdan oluşturulur
+        if not circuit.gates:
+            metrics.update(self._empty_circuit_metrics(circuit, hardware_model))
+            self.metrics = metrics
+            return metrics
         
         # Bellek kullanım metrikleri
         metrics["memory_efficiency"] = self._calculate_memory_efficiency(circuit)
@@ -76,6 +174,54 @@ class PerformanceAnalyzer:
         self.metrics = metrics
         return metrics
     
+    def _empty_circuit_metrics(self, circuit, hardware_model=None):
+        """
+        Kapısız devrenin bellek ve donanım metriklerini oluşturur
+        
+        Tüm qubit'lerin kullanım oranı, yaşam süresi ve kapı sayısı sıfırdır.
+        
+        Args:
+            circuit: Kapısı olmayan devre
+            hardware_model: Donanım modeli (opsiyonel)
+            
+        Returns:
+            dict: memory_efficiency, qubit_usage ve (donanım modeli verildiyse)
+                hardware_compatibility metrikleri
+        """
+        qubit_ids = {qubit.id: 0 for qubit in circuit.qubits}
+        avg_usage, max_usage, min_usage = _value_stats([0.0] * len(qubit_ids))
+        avg_count, max_count, min_count = _value_stats([0] * len(qubit_ids))
+        
+        metrics = {
+            "memory_efficiency": {
+                "average_usage_ratio": avg_usage,
+                "max_usage_ratio": max_usage,
+                "min_usage_ratio": min_usage,
+                "is_memory_efficient": False
+            },
+            "qubit_usage": {
+                "average_lifetime": avg_count,
+                "max_lifetime": max_count,
+                "min_lifetime": min_count,
+                "average_gates_per_qubit": avg_count,
+                "max_gates_per_qubit": max_count,
+                "min_gates_per_qubit": min_count,
+                "qubit_lifetimes": dict(qubit_ids),
+                "gate_distribution": dict(qubit_ids)
+            }
+        }
+        
+        if hardware_model:
+            qubit_count_compatible = circuit.width <= hardware_model.num_qubits
+            metrics["hardware_compatibility"] = {
+                "qubit_count_compatible": qubit_count_compatible,
+                "unsupported_gate_count": 0,
+                "connectivity_violations": 0,
+                "overall_compatibility": qubit_count_compatible
+            }
+        
+        return metrics
+    
     def _calculate_memory_efficiency(self, circuit):
         """
         Devrenin bellek verimliliğini hesaplar
@@ -89,12 +235,8 @@ class PerformanceAnalyzer:
         # Qubit kullanım oranları
         usage_stats = circuit.calculate_qubit_usage()
         
-        # Ortalama qubit kullanım oranı
-        avg_usage = sum(ratio for _, _, ratio in usage_stats.values()) / len(usage_stats) if usage_stats else 0
-        
-        # Maksimum ve minimum kullanım oranları
-        max_usage = max(ratio for _, _, ratio in usage_stats.values()) if usage_stats else 0
-        min_usage = min(ratio for _, _, ratio in usage_stats.values()) if usage_stats else 0
+        # Ortalama, maksimum ve minimum kullanım oranları
+        avg_usage, max_usage, min_usage = _value_stats([ratio for _, _, ratio in usage_stats.values()])
         
         # Sonuç
         return {
@@ -114,28 +256,22 @@ class PerformanceAnalyzer:
         Returns:
             dict: Qubit kullanım metrikleri
         """
-        # Her qubit'in ne kadar süre kullanıldığını hesapla
+        # Her qubit'in ne kadar süre kullanıldığını kapılar üzerinden tek geçişte hesapla
         qubit_lifetimes = {}
-        for qubit in circuit.qubits:
-            first_time, last_time = circuit.get_qubit_lifetime(qubit)
-            lifetime = last_time - first_time
-            qubit_lifetimes[qubit.id] = lifetime
+        for qubit, (first_time, last_time) in zip(circuit.qubits, circuit.get_qubit_lifetimes()):
+            qubit_lifetimes[qubit.id] = last_time - first_time
         
         # Kullanım süreleri istatistikleri
-        avg_lifetime = sum(qubit_lifetimes.values()) / len(qubit_lifetimes) if qubit_lifetimes else 0
-        max_lifetime = max(qubit_lifetimes.values()) if qubit_lifetimes else 0
-        min_lifetime = min(qubit_lifetimes.values()) if qubit_lifetimes else 0
+        avg_lifetime, max_lifetime, min_lifetime = _value_stats(list(qubit_lifetimes.values()))
         
         # Kapı sayısı dağılımı
+        gate_index = self._build_gate_index(circuit)
         gate_distribution = defaultdict(int)
         for qubit in circuit.qubits:
-            gate_count = len(circuit.get_gates_by_qubit(qubit))
-            gate_distribution[qubit.id] = gate_count
+            gate_distribution[qubit.id] = len(gate_index[qubit])
         
         # Ortalama, maksimum ve minimum kapı sayısı
-        avg_gates = sum(gate_distribution.values()) / len(gate_distribution) if gate_distribution else 0
-        max_gates = max(gate_distribution.values()) if gate_distribution else 0
-        min_gates = min(gate_distribution.values()) if gate_distribution else 0
+        avg_gates, max_gates, min_gates = _value_stats(list(gate_distribution.values()))
         
         return {
             "average_lifetime": avg_lifetime,
@@ -148,6 +284,25 @@ class PerformanceAnalyzer:
             "gate_distribution": dict(gate_distribution)
         }
     
+    def _build_gate_index(self, circuit):
+        """
+        Devredeki kapıları tek geçişte qubit'lere göre gruplar
+        
+        Args:
+            circuit: İndekslenecek devre
+            
+        Returns:
+            dict: {qubit: [kapılar]}; get_gates_by_qubit ile aynı kapılar, devre sırasında
+        """
+        gate_index = {qubit: [] for qubit in circuit.qubits}
+        for gate in circuit.gates:
+            for qubit in gate.qubits:
+                qubit_gates = gate_index.get(qubit)
+                # Aynı qubit'i birden fazla kez içeren kapı bir kez sayılır
+                if qubit_gates is not None and (not qubit_gates or qubit_gates[-1] is not gate):
+                    qubit_gates.append(gate)
+        return gate_index
+    
     def _calculate_hardware_compatibility(self, circuit, hardware_model):
         """
         Devrenin donanımla uyumluluğunu hesaplar
@@ -159,50 +314,67 @@ class PerformanceAnalyzer:
         Returns:
             dict: Donanım uyumluluğu metrikleri
         """
-        # Desteklenmeyen kapıları say
-        unsupported_gates = []
-        for gate in circuit.gates:
-            if gate.type not in hardware_model.supported_gates:
-                unsupported_gates.append(gate)
+        # Desteklenen kapılar
+        supported_gates = set(hardware_model.supported_gates)
+        
+        # Bağlantılı düğümlere indeks ver ve bağlantı matrisini oluştur
+        connections = hardware_model.get_connections()
+        node_index = {}
+        for qubit1_id, qubit2_id in connections:
+            node_index.setdefault(qubit1_id, len(node_index))
+            node_index.setdefault(qubit2_id, len(node_index))
+        connected = np.zeros((len(node_index), len(node_index)), dtype=np.bool_)
+        for qubit1_id, qubit2_id in connections:
+            i, j = node_index[qubit1_id], node_index[qubit2_id]
+            connected[i, j] = connected[j, i] = True
         
         # Qubit sayısı uyumluluğu
         qubit_count_compatible = circuit.width <= hardware_model.num_qubits
         
+        # Desteklenmeyen kapıları say
+        unsupported_count = sum(1 for gate in circuit.gates if gate.type not in supported_gates)
+        
+        # Çok qubitli kapıların qubit'lerini düğüm indeksleri olarak arka arkaya diz
+        gate_qubit_lists = [gate.qubits for gate in circuit.gates if len(gate.qubits) > 1]
+        qubit_ids = [getattr(qubit, 'id', qubit) for qubits in gate_qubit_lists for qubit in qubits]
+        qubit_indices = np.fromiter(map(node_index.get, qubit_ids, repeat(-1)),
+                                    dtype=np.int64, count=len(qubit_ids))
+        offsets = np.zeros(len(gate_qubit_lists) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, gate_qubit_lists), dtype=np.int64,
+                              count=len(gate_qubit_lists)), out=offsets[1:])
+        
         # Çok qubitli kapılar için bağlantı uyumluluğu
-        connectivity_violations = []
-        for gate in circuit.gates:
-            if len(gate.qubits) <= 1:
-                continue
-                
-            for i in range(len(gate.qubits) - 1):
-                for j in range(i + 1, len(gate.qubits)):
-                    q1, q2 = gate.qubits[i], gate.qubits[j]
-                    if not hardware_model.are_connected(q1, q2):
-                        connectivity_violations.append((gate, q1, q2))
+        connectivity_violations = _count_connectivity_violations(
+            qubit_indices, offsets, _pack_adjacency(connected))
         
         return {
             "qubit_count_compatible": qubit_count_compatible,
-            "unsupported_gate_count": len(unsupported_gates),
-            "connectivity_violations": len(connectivity_violations),
+            "unsupported_gate_count": unsupported_count,
+            "connectivity_violations": connectivity_violations,
             "overall_compatibility": (qubit_count_compatible and 
-                                     len(unsupported_gates) == 0 and 
-                                     len(connectivity_violations) == 0)
+                                     unsupported_count == 0 and 
+                                     connectivity_violations == 0)
         }
     
-    def compare_circuits(self, original_circuit, compiled_circuit):
+    def compare_circuits(self, original_circuit=None, compiled_circuit=None, *,
+                         original_metrics=None, compiled_metrics=None):
         """
         İki devreyi karşılaştırır
         
         Args:
             original_circuit: Orijinal devre
             compiled_circuit: Derlenmiş devre
+            original_metrics: Orijinal devre için önceden hesaplanmış metrikler (opsiyonel)
+            compiled_metrics: Derlenmiş devre için önceden hesaplanmış metrikler (opsiyonel)
             
         Returns:
             dict: Karşılaştırma metrikleri
         """
-        # Her iki devreyi de analiz et
-        original_metrics = self.analyze_circuit(original_circuit)
-        compiled_metrics = self.analyze_circuit(compiled_circuit)
+        # Metrikleri verilmeyen devreleri analiz et
+        if original_metrics is None:
+            original_metrics = self.analyze_circuit(original_circuit)
+        if compiled_metrics is None:
+            compiled_metrics = self.analyze_circuit(compiled_circuit)
         
         # Değişim metrikleri
         comparison = {
@@ -213,6 +385,11 @@ class PerformanceAnalyzer:
                                         original_metrics["memory_efficiency"]["average_usage_ratio"])
         }
         
+        # Kapı tipi başına sayı değişimleri (değişmeyen tipler atlanır)
+        gate_type_deltas = Counter(compiled_metrics["gate_counts"])
+        gate_type_deltas.subtract(original_metrics["gate_counts"])
+        comparison["gate_type_deltas"] = {name: delta for name, delta in gate_type_deltas.items() if delta}
+        
         # Yüzdelik değişimler
         if original_metrics["qubit_count"] > 0:
             comparison["qubit_reduction_percent"] = ((original_metrics["qubit_count"] - compiled_metrics["qubit_count"]) / 
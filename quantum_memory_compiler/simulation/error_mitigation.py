@@ -32,6 +32,26 @@ import copy
 import matplotlib
 matplotlib.use('Agg')
 
+
+def _results_to_vector(results, num_qubits):
+    """
+    Bit dizisi anahtarlı sonuçları 2^N uzunluğunda olasılık vektörüne çevirir
+    
+    Args:
+        results: {bit dizisi: olasılık} sözlüğü
+        num_qubits: Qubit sayısı
+        
+    Returns:
+        np.ndarray: Temel durum indeksine göre sıralanmış olasılıklar
+    """
+    # Uzunluğu qubit sayısına uymayan durumlar, sözlük aramasında olduğu gibi yok sayılır
+    states = np.fromiter((int(state, 2) if len(state) == num_qubits else -1 for state in results),
+                         dtype=np.int64, count=len(results))
+    probs = np.fromiter(results.values(), dtype=np.float64, count=len(results))
+    valid = states >= 0
+    return np.bincount(states[valid], weights=probs[valid], minlength=2**num_qubits)
+
+
 class ErrorMitigation:
     """
     Kuantum hata azaltma tekniklerini gerçekleştiren sınıf
@@ -50,6 +70,8 @@ class ErrorMitigation:
         self.simulator = simulator
         self.calibration_data = {}
         self.correction_matrices = {}
+        self.tensored_correction_matrices = {}  # Qubit başına 2x2 ters matrisler
+        self.dense_calibration_max_qubits = 6  # Bu sayıya kadar tam 2^N matris kullanılır
         self.extrapolation_scales = [1.0, 1.5, 2.0, 3.0]  # ZNE için ölçekleme faktörleri
         self.ansatz_results = defaultdict(list)  # ZNE sonuçları için
     
@@ -57,6 +79,10 @@ class ErrorMitigation:
         """
         Ölçüm hatalarını kalibre eder
         
+        Qubit sayısı dense_calibration_max_qubits değerini aşarsa ölçüm hatalarının
+        qubit'ler arasında bağımsız olduğu varsayılır ve 2^N yerine yalnızca iki
+        devre (tüm qubit'ler |0⟩ ve tüm qubit'ler |1⟩) çalıştırılır.
+        
         Args:
             circuit: Kalibrasyon devreleri oluşturmak için kullanılacak temel devre
             shots: Her kalibrasyon devresi için simülasyon tekrar sayısı
@@ -68,7 +94,11 @@ class ErrorMitigation:
         from ..core.gate import Gate, GateType
         
         num_qubits = circuit.width
-        basis_states = [format(i, f'0{num_qubits}b') for i in range(2**num_qubits)]
+        if num_qubits > self.dense_calibration_max_qubits:
+            # Tensörlü kalibrasyon: her qubit için |0⟩ ve |1⟩ hazırlığı yeterli
+            basis_states = ['0' * num_qubits, '1' * num_qubits]
+        else:
+            basis_states = [format(i, f'0{num_qubits}b') for i in range(2**num_qubits)]
         
         # Her temel durum için bir kalibrasyon devresi oluştur
         cal_results = {}
@@ -113,17 +143,15 @@ class ErrorMitigation:
         if not self.calibration_data:
             raise ValueError("Kalibrasyon verileri mevcut değil. Önce calibrate_measurement_errors işlevini çağırın.")
         
-        basis_states = [format(i, f'0{num_qubits}b') for i in range(2**num_qubits)]
-        n = len(basis_states)
-        
-        # Kalibrasyon matrisini oluştur
-        cal_matrix = np.zeros((n, n))
+        if num_qubits > self.dense_calibration_max_qubits:
+            self._compute_tensored_correction_matrices(num_qubits)
+            return
         
-        for i, prepared_state in enumerate(basis_states):
-            results = self.calibration_data.get(prepared_state, {})
-            
-            for j, measured_state in enumerate(basis_states):
-                cal_matrix[i, j] = results.get(measured_state, 0.0)
+        # Kalibrasyon matrisini oluştur (her satır bir hazırlanan durumun ölçüm dağılımı)
+        cal_matrix = np.stack([
+            _results_to_vector(self.calibration_data.get(format(i, f'0{num_qubits}b'), {}), num_qubits)
+            for i in range(2**num_qubits)
+        ], axis=0)
         
         # Matrisin tersini al (düzeltme matrisi)
         try:
@@ -135,6 +163,43 @@ class ErrorMitigation:
             self.correction_matrices[num_qubits] = correction_matrix
             print(f"Uyarı: {num_qubits} qubit için düzeltme matrisi oluştururken tersini alamadık. Sözde-ters kullanıldı.")
     
+    def _compute_tensored_correction_matrices(self, num_qubits):
+        """
+        Qubit başına 2x2 ölçüm hatası düzeltme matrislerini hesaplar
+        
+        Tam kalibrasyon matrisi C = M_0 ⊗ ... ⊗ M_{N-1} kabul edilir; M_k[a, b]
+        qubit k |a⟩ hazırlandığında b ölçülme olasılığıdır. C'nin tersi de
+        ters matrislerin Kronecker çarpımı olduğundan yalnızca N adet 2x2 ters saklanır.
+        
+        Args:
+            num_qubits: Qubit sayısı
+        """
+        cal_matrices = np.zeros((num_qubits, 2, 2))
+        shifts = np.arange(num_qubits - 1, -1, -1)
+        
+        for prepared_bit, prepared_state in enumerate(('0' * num_qubits, '1' * num_qubits)):
+            results = self.calibration_data.get(prepared_state, {})
+            if not results:
+                continue
+            
+            # Ölçülen durumları bit matrisine çevir ve qubit başına marjinalleri topla
+            states = np.fromiter((int(state, 2) for state in results), dtype=np.int64, count=len(results))
+            probs = np.fromiter(results.values(), dtype=np.float64, count=len(results))
+            bits = (states[:, None] >> shifts) & 1
+            
+            ones = probs @ bits
+            cal_matrices[:, prepared_bit, 1] = ones
+            cal_matrices[:, prepared_bit, 0] = probs.sum() - ones
+        
+        # Her 2x2 matrisin tersini al
+        try:
+            correction_matrices = np.linalg.inv(cal_matrices)
+        except np.linalg.LinAlgError:
+            correction_matrices = np.linalg.pinv(cal_matrices)
+            print(f"Uyarı: {num_qubits} qubit için düzeltme matrisi oluştururken tersini alamadık. Sözde-ters kullanıldı.")
+        
+        self.tensored_correction_matrices[num_qubits] = correction_matrices
+    
     def apply_measurement_error_mitigation(self, results, num_qubits):
         """
         Ölçüm hatası azaltma tekniğini uygular
@@ -146,19 +211,22 @@ class ErrorMitigation:
         Returns:
             dict: Düzeltilmiş sonuçlar
         """
-        if num_qubits not in self.correction_matrices:
+        if num_qubits not in self.correction_matrices and num_qubits not in self.tensored_correction_matrices:
             raise ValueError(f"{num_qubits} qubit için düzeltme matrisi bulunamadı.")
         
-        basis_states = [format(i, f'0{num_qubits}b') for i in range(2**num_qubits)]
-        n = len(basis_states)
-        
         # Sonuçları bir vektöre dönüştür
-        count_vector = np.zeros(n)
-        for i, state in enumerate(basis_states):
-            count_vector[i] = results.get(state, 0.0)
+        count_vector = _results_to_vector(results, num_qubits)
         
         # Düzeltme matrisini uygula
-        corrected_vector = np.dot(self.correction_matrices[num_qubits], count_vector)
+        if num_qubits in self.correction_matrices:
+            corrected_vector = np.dot(self.correction_matrices[num_qubits], count_vector)
+        else:
+            # Kronecker çarpımının tersini qubit eksenleri boyunca sırayla uygula
+            corrected_vector = count_vector.reshape((2,) * num_qubits)
+            for k, correction_matrix in enumerate(self.tensored_correction_matrices[num_qubits]):
+                corrected_vector = np.tensordot(correction_matrix, corrected_vector, axes=([1], [k]))
+                corrected_vector = np.moveaxis(corrected_vector, 0, k)
+            corrected_vector = corrected_vector.reshape(-1)
         
         # Negatif değerleri sıfırla ve normalizasyon
         corrected_vector = np.maximum(0, corrected_vector)
@@ -167,9 +235,8 @@ class ErrorMitigation:
         
         # Düzeltilmiş sonuçları oluştur
         corrected_results = {}
-        for i, state in enumerate(basis_states):
-            if corrected_vector[i] > 1e-10:  # Çok küçük değerleri atla
-                corrected_results[state] = corrected_vector[i]
+        for i in np.flatnonzero(corrected_vector > 1e-10):  # Çok küçük değerleri atla
+            corrected_results[format(i, f'0{num_qubits}b')] = corrected_vector[i]
         
         return corrected_results
     
@@ -391,6 +458,7 @@ class ErrorMitigation:
         """Kalibrasyon verilerini temizler"""
         self.calibration_data = {}
         self.correction_matrices = {}
+        self.tensored_correction_matrices = {}
         self.ansatz_results = defaultdict(list)
     
     def get_extrapolation_data(self, circuit_name=None):
@@ -19,11 +19,15 @@ This file contains proprietary algorithms for quantum memory optimization.
 Commercial use requires explicit permission.
 """
 
+import heapq
+import random
+
 import pytest
+from quantum_memory_compiler.core import Qubit
 from quantum_memory_compiler.memory import MemoryHierarchy, MemoryManager
 from quantum_memory_compiler.memory.allocation import QubitAllocator
 from quantum_memory_compiler.memory.recycling import QubitRecycler, RecyclingStrategy
-from quantum_memory_compiler.core import Circuit
+from quantum_memory_compiler.core import Circuit, GateType
 
 def test_memory_hierarchy_creation():
     """Test memory hierarchy creation and properties"""
@@ -41,6 +45,107 @@ def test_memory_hierarchy_creation():
     utilization = memory.get_utilization_stats()
     assert all(v == 0 for v in utilization.values())  # All levels should be empty
 
+def test_memory_level_slot_reuse():
+    """Test that a memory level reuses freed slots and resets in bulk"""
+    memory = MemoryHierarchy(l1_capacity=2, l2_capacity=4, l3_capacity=8)
+    level = memory.levels["L1"]
+    circuit = Circuit(3)
+    q0, q1, q2 = circuit.qubits
+    
+    assert memory.allocate_qubit(q0, "L1")
+    assert memory.allocate_qubit(q1, "L1")
+    assert not memory.allocate_qubit(q2, "L1")  # Level is full
+    
+    assert memory.deallocate_qubit(q0)
+    assert not level.deallocate_qubit(q0)  # Already freed
+    assert memory.allocate_qubit(q2, "L1")
+    assert set(level.active_qubits) == {q1, q2}
+    
+    memory.reset()
+    assert level.used_qubits == 0
+    assert level.active_qubits == []
+    assert level.available_capacity == 2
+
+def _reference_smart_route(hierarchy, qubit, target_level):
+    """Route chosen by the unpruned indirect path search (intermediate level or None)"""
+    current_level = qubit.memory_level.name
+    direct_cost = hierarchy.get_transfer_cost(current_level, target_level, qubit)
+    indirect_costs = {}
+    for intermediate in ["L1", "L2", "L3"]:
+        if intermediate != current_level and intermediate != target_level:
+            indirect_costs[intermediate] = (hierarchy.get_transfer_cost(current_level, intermediate, qubit) +
+                                            hierarchy.get_transfer_cost(intermediate, target_level, qubit))
+    if indirect_costs and min(indirect_costs.values()) < direct_cost * 0.8:
+        return min(indirect_costs, key=indirect_costs.get)
+    return None
+
+def _check_smart_transfer(memory, qubit, target_level):
+    """Compares smart_transfer with the unpruned search; returns whether a two-hop route was taken"""
+    source_level = qubit.memory_level.name
+    intermediate = _reference_smart_route(memory, qubit, target_level)
+    if intermediate is None:
+        expected_time = memory.transfer_times.get((source_level, target_level), 10)
+    else:
+        expected_time = (memory.transfer_times.get((source_level, intermediate), 10) +
+                         memory.transfer_times.get((intermediate, target_level), 10))
+    transfers_before = memory.total_transfers
+    
+    assert memory.smart_transfer(qubit, target_level) == (True, expected_time, target_level)
+    assert memory.total_transfers - transfers_before == (1 if intermediate is None else 2)
+    return intermediate is not None
+
+def test_smart_transfer_matches_unpruned_search():
+    """Test that skipping the indirect path search never changes smart_transfer's route"""
+    # Static cost of L2 -> L1 -> L3 (11) is above 0.8 * L2 -> L3 (10.4); only the
+    # L1 activity bonus on the first leg makes the two-hop route cheaper
+    memory = MemoryHierarchy()
+    for key, time in {("L2", "L1"): 1, ("L1", "L3"): 10, ("L2", "L3"): 13}.items():
+        memory.transfer_times[key] = time
+        memory.transfer_error_rates[key] = 0
+    memory.invalidate_cost_tables()
+    qubit = Qubit(0)
+    assert memory.allocate_qubit(qubit, "L2")
+    qubit.coherence_time = 400
+    qubit.gate_count = 11
+    assert _check_smart_transfer(memory, qubit, "L3")
+    
+    rng = random.Random(0)
+    config = {"hierarchy": {"levels": [{"name": "fast_memory", "capacity": 50, "access_time": 1}]}}
+    indirect_routes = 0
+    
+    for case in range(300):
+        if case % 2:
+            memory = MemoryHierarchy.from_config(config)
+        else:
+            memory = MemoryHierarchy(l1_capacity=50, l2_capacity=50, l3_capacity=50)
+            memory.add_level("buffer", capacity=50, access_time=rng.choice([0.5, 1, 3]), coherence_time=300)
+        
+        # Random transfer times, including cheap two-hop routes
+        for key in list(memory.transfer_times):
+            if rng.random() < 0.5:
+                memory.transfer_times[key] = rng.randint(0, 40)
+                memory.transfer_error_rates[key] = rng.choice([0, 0, 0.005, 0.05])
+        memory.invalidate_cost_tables()
+        
+        # Random utilization and level coherence times
+        for name, level in memory.levels.items():
+            level.coherence_time = rng.choice([10, 100, 500, 2000])
+            for index in range(rng.randint(0, 45)):
+                level.allocate_qubit(Qubit(1000 + index))
+        
+        source, target = rng.sample(["L1", "L2", "L3"], 2)
+        if rng.random() < 0.3:
+            target = rng.choice([name for name in memory.levels if name not in ("L1", "L2", "L3")])
+        
+        qubit = Qubit(case)
+        assert memory.allocate_qubit(qubit, source)
+        qubit.coherence_time = rng.choice([1, 20, 100, 400])
+        qubit.gate_count = rng.choice([0, 11])
+        
+        indirect_routes += _check_smart_transfer(memory, qubit, target)
+    
+    assert indirect_routes > 0
+
 def test_memory_manager():
     """Test memory manager and qubit allocation"""
     hierarchy = MemoryHierarchy(l1_capacity=10, l2_capacity=20, l3_capacity=30)
@@ -66,6 +171,147 @@ def test_memory_manager():
     stats = manager.get_memory_stats()
     assert stats["active_qubits"] == 0
 
+def test_memory_manager_id_reuse():
+    """Test that freed qubit ids are reused and never collide with live ones"""
+    hierarchy = MemoryHierarchy(l1_capacity=10, l2_capacity=20, l3_capacity=30)
+    manager = MemoryManager(hierarchy, allocator_strategy="static")
+    
+    qubits = manager.allocate_qubits(3, level_name="L1")
+    assert [q.id for q in qubits] == [0, 1, 2]
+    
+    manager.deallocate_qubit(qubits[1])
+    reused = manager.allocate_qubit("L2")
+    fresh = manager.allocate_qubit("L2")
+    assert reused.id == 1
+    assert fresh.id == 3
+    assert manager.get_qubit_memory_level(reused) == "L2"
+    assert manager.get_qubit_memory_level(qubits[1]) is None  # Stale handle
+    assert manager.get_memory_stats()["level_distribution"] == {"L1": 2, "L2": 2}
+
+def test_memory_manager_optimization_interval():
+    """Test that changing the optimization interval takes effect immediately"""
+    hierarchy = MemoryHierarchy(l1_capacity=10, l2_capacity=20, l3_capacity=30)
+    manager = MemoryManager(hierarchy, allocator_strategy="static")
+    manager.allocate_qubits(1, level_name="L3")
+    
+    manager.update_time(5)
+    assert manager.optimize_memory(Circuit(), 5) == 0
+    
+    manager.optimization_interval = 1
+    assert manager.optimize_memory(Circuit(), 5) == 1
+
+def test_memory_manager_prefetch():
+    """Test that regularly accessed qubits are promoted just before their next access"""
+    hierarchy = MemoryHierarchy(l1_capacity=10, l2_capacity=20, l3_capacity=30)
+    manager = MemoryManager(hierarchy, allocator_strategy="static", prefetch=True)
+    
+    streaming, irregular = manager.allocate_qubits(2, level_name="L2")
+    for time in (10, 20, 30, 40, 50):
+        manager.update_qubit_usage(streaming, time)
+    for time in (3, 4, 30, 49, 50):
+        manager.update_qubit_usage(irregular, time)
+    
+    manager.update_time(51)
+    assert manager.optimize_memory(Circuit(), 51) == 2
+    
+    # Next access predicted at 60; L2 -> L1 takes 5 units
+    scheduled = {qubit.id: time for time, _, qubit, level in manager.transfer_queue}
+    assert scheduled == {streaming.id: 55, irregular.id: 51}
+
+def test_memory_manager_prefetch_keeps_streaming_qubit():
+    """Test that a prefetched qubit is not demoted again between its regular accesses"""
+    hierarchy = MemoryHierarchy()
+    manager = MemoryManager(hierarchy, allocator_strategy="static", prefetch=True)
+    qubit, = manager.allocate_qubits(1, level_name="L1")
+    
+    # The long remaining lifetime alone would keep the qubit in L3
+    circuit = Circuit()
+    circuit.add_gate(GateType.X, qubit, time=5000)
+    
+    levels = []
+    for time in range(600):
+        manager.update_time(time)
+        if time % 40 == 0:
+            manager.update_qubit_usage(qubit, time)
+        manager.optimize_memory(circuit, time)
+        manager.process_transfers(time)
+        levels.append(qubit.memory_level.name)
+    
+    # One demotion before the access pattern is recognized, then one promotion
+    assert hierarchy.total_transfers == 2
+    assert levels[-1] == "L1"
+
+def test_memory_manager_transfer_queue_order():
+    """Test that the timing wheel releases transfers in the same order as a plain heap"""
+    hierarchy = MemoryHierarchy()
+    manager = MemoryManager(hierarchy, allocator_strategy="static")
+    rng = random.Random(1)
+    reference = []
+    popped, expected = [], []
+    seq = 0
+    current_time = 0
+    
+    for step in range(200):
+        # Near, same-time, non-integer, past and beyond-horizon schedule times
+        for _ in range(rng.randint(0, 6)):
+            scheduled_time = rng.choice([
+                current_time + rng.randint(0, 5),
+                current_time + rng.randint(0, 3),
+                current_time + rng.randint(0, 20) + 0.5,
+                max(0, current_time - rng.randint(1, 5)),
+                current_time + rng.randint(60, 300),
+            ])
+            target = rng.choice(["L1", "L2", "L3"])
+            manager.queue_transfer(Qubit(seq), target, scheduled_time)
+            heapq.heappush(reference, (scheduled_time, seq, target))
+            seq += 1
+        
+        current_time += rng.choice([0, 1, 1, 2, 7, 0.25])
+        popped.extend((qubit.id, target) for qubit, target in manager._pop_ready_transfers(current_time))
+        while reference and reference[0][0] <= current_time:
+            scheduled_time, qubit_id, target = heapq.heappop(reference)
+            expected.append((qubit_id, target))
+        assert manager.pending_transfer_count == len(reference)
+    
+    assert popped == expected
+    assert [(entry[1], entry[3]) for entry in manager.transfer_queue] == [entry[1:] for entry in sorted(reference)]
+
+def test_memory_manager_batched_transfers_match_sequential():
+    """Test that batching consecutive transfers gives the same result as processing them one by one"""
+    rng = random.Random(2)
+    managers = []
+    for _ in range(2):
+        hierarchy = MemoryHierarchy(l1_capacity=8, l2_capacity=20, l3_capacity=40)
+        manager = MemoryManager(hierarchy, allocator_strategy="static")
+        qubits = manager.allocate_qubits(30, level_name="L3")
+        managers.append((manager, qubits))
+    
+    # Runs of the same source/target pair, repeated qubits and interleaved pairs
+    schedule = []
+    for time in range(30):
+        target = rng.choice(["L1", "L2", "L3"])
+        for _ in range(rng.randint(0, 8)):
+            if rng.random() < 0.2:
+                target = rng.choice(["L1", "L2", "L3"])
+            schedule.append((rng.randrange(30), target, time + rng.choice([0, 0, 0.5])))
+    
+    for manager, qubits in managers:
+        for index, target, time in schedule:
+            manager.queue_transfer(qubits[index], target, time)
+    
+    batched, batched_qubits = managers[0]
+    sequential, sequential_qubits = managers[1]
+    for time in range(0, 32, 3):
+        batched.process_transfers(time)
+        sequential.current_time = time
+        for qubit, target in list(sequential._pop_ready_transfers(time)):
+            sequential.transfer_qubit(qubit, target)
+    
+    assert [q.memory_level.name for q in batched_qubits] == [q.memory_level.name for q in sequential_qubits]
+    assert batched.memory_hierarchy.get_utilization_stats() == sequential.memory_hierarchy.get_utilization_stats()
+    assert batched.memory_hierarchy.get_transfer_stats() == sequential.memory_hierarchy.get_transfer_stats()
+    assert batched.memory_hierarchy.total_transfers == sequential.memory_hierarchy.total_transfers
+
 def test_qubit_allocator():
     """Test different qubit allocation strategies"""
     circuit = Circuit.create_bell_state()
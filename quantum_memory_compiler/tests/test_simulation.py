@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Quantum Memory Compiler - Advanced Memory-Aware Quantum Circuit Compilation
+Copyright (c) 2025 Quantum Memory Compiler Project
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+This file contains proprietary algorithms for quantum memory optimization.
+Commercial use requires explicit permission.
+"""
+
+import numpy as np
+import pytest
+from quantum_memory_compiler.simulation.error_mitigation import ErrorMitigation
+
+def test_tensored_measurement_error_mitigation_matches_dense():
+    """Test that the tensored readout correction equals the dense one for independent errors"""
+    num_qubits = 7
+    rng = np.random.default_rng(7)
+
+    # Independent readout errors: the full calibration matrix is a Kronecker product
+    flip_rates = rng.uniform(0.01, 0.1, size=(num_qubits, 2))
+    qubit_matrices = [np.array([[1 - p10, p10], [p01, 1 - p01]]) for p10, p01 in flip_rates]
+    cal_matrix = qubit_matrices[0]
+    for matrix in qubit_matrices[1:]:
+        cal_matrix = np.kron(cal_matrix, matrix)
+
+    basis_states = [format(i, f'0{num_qubits}b') for i in range(2**num_qubits)]
+    calibration_data = {prepared: dict(zip(basis_states, row))
+                        for prepared, row in zip(basis_states, cal_matrix)}
+
+    dense = ErrorMitigation(simulator=None)
+    dense.dense_calibration_max_qubits = num_qubits
+    dense.calibration_data = calibration_data
+    dense._compute_correction_matrices(num_qubits)
+
+    # Only the all-|0> and all-|1> preparations are needed above the dense limit
+    tensored = ErrorMitigation(simulator=None)
+    assert num_qubits > tensored.dense_calibration_max_qubits
+    tensored.calibration_data = {state: calibration_data[state] for state in (basis_states[0], basis_states[-1])}
+    tensored._compute_correction_matrices(num_qubits)
+
+    assert num_qubits not in tensored.correction_matrices
+    assert tensored.tensored_correction_matrices[num_qubits].shape == (num_qubits, 2, 2)
+
+    # Noisy results of a GHZ-like distribution
+    ideal = np.zeros(2**num_qubits)
+    ideal[0] = ideal[-1] = 0.5
+    noisy = cal_matrix @ ideal
+    results = dict(zip(basis_states, noisy))
+
+    dense_results = dense.apply_measurement_error_mitigation(results, num_qubits)
+    tensored_results = tensored.apply_measurement_error_mitigation(results, num_qubits)
+
+    assert dense_results.keys() == tensored_results.keys()
+    for state, probability in dense_results.items():
+        assert tensored_results[state] == pytest.approx(probability, abs=1e-12)